@@ -0,0 +1,36 @@
+# app/concurrency.py
+from __future__ import annotations
+
+import os
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+import anyio
+from anyio import to_thread
+
+T = TypeVar("T")
+
+# Dedicated limiter for the upload path. Sync endpoints and dependencies share
+# AnyIO's default pool (40 threads); keeping uploads on their own bounded pool means
+# a burst of large uploads can't starve GET /recordings or /healthz of threads.
+_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def _pool_size() -> int:
+    try:
+        return max(int(os.getenv("BLOCKING_POOL_SIZE", "16")), 1)
+    except ValueError:
+        return 16
+
+
+def _get_limiter() -> anyio.CapacityLimiter:
+    # created lazily: a CapacityLimiter needs a running event loop
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(_pool_size())
+    return _limiter
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call (boto3, SQLAlchemy, hashing) off the event loop on the bounded pool."""
+    return await to_thread.run_sync(partial(func, *args, **kwargs), limiter=_get_limiter())
@@ -0,0 +1,78 @@
+# app/events.py
+"""
+Server-sent events for GET /recordings/{rid}/events.
+
+Each connection subscribes to the recording's Redis channel (worker/progress.py),
+replays the last published event, then forwards new ones until the run reaches a
+terminal status or the client goes away. Comment lines every SSE_HEARTBEAT_SEC keep
+proxies from closing idle streams. Postgres is only consulted (once, by the caller)
+when Redis has no event for the recording yet.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import Request
+from redis import asyncio as aioredis
+
+from worker.progress import TERMINAL_STATUSES, channel, last_key
+from worker.queue import REDIS_URL
+
+_client: Optional[aioredis.Redis] = None
+
+
+def _heartbeat_sec() -> float:
+    try:
+        return max(float(os.getenv("SSE_HEARTBEAT_SEC", "15")), 1.0)
+    except ValueError:
+        return 15.0
+
+
+def _redis() -> aioredis.Redis:
+    # one pool per API process; each stream holds one pub/sub connection while open
+    global _client
+    if _client is None:
+        _client = aioredis.Redis.from_url(REDIS_URL)
+    return _client
+
+
+def _sse(event: Dict) -> str:
+    return f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+
+async def last_event(recording_id: str) -> Optional[Dict]:
+    raw = await _redis().get(last_key(recording_id))
+    return json.loads(raw) if raw else None
+
+
+async def progress_stream(
+    request: Request, recording_id: str, initial: Optional[Dict]
+) -> AsyncIterator[str]:
+    """
+    `initial` is the caller's snapshot (last Redis event, or one built from the DB);
+    it's sent first, and the stream ends right away if it's already terminal.
+    """
+    pubsub = _redis().pubsub()
+    await pubsub.subscribe(channel(recording_id))
+    try:
+        # subscribed before re-reading: nothing published in between is lost
+        current = await last_event(recording_id) or initial
+        if current:
+            yield _sse(current)
+            if current.get("status") in TERMINAL_STATUSES:
+                return
+        heartbeat = _heartbeat_sec()
+        while not await request.is_disconnected():
+            msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+            if msg is None:
+                yield ": keep-alive\n\n"
+                continue
+            event = json.loads(msg["data"])
+            yield _sse(event)
+            if event.get("status") in TERMINAL_STATUSES:
+                return
+    finally:
+        await pubsub.unsubscribe(channel(recording_id))
+        await pubsub.aclose()
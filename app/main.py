@@ -1,30 +1,58 @@
 # app/main.py
+import json
 import os
 import uuid
-import tempfile
 from datetime import datetime
-from hashlib import sha256
 
 from dotenv import load_dotenv
 from fastapi import (
     FastAPI,
     Depends,
     HTTPException,
+    Query,
+    Request,
     status,
-    UploadFile,
-    File,
-    Form,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text, func
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text, select, tuple_, update, insert, literal, or_, case, exists, null
+from sqlalchemy.orm import Session, joinedload
+from botocore.exceptions import BotoCoreError, ClientError
 
 from app.db import engine, SessionLocal
-from app.models import Recording, Transcript, Task, RecordingStatusEnum, User
-from app.r2 import upload_fileobj
+from app.models import (
+    Recording, Transcript, TranscriptSegment, Task, RecordingStatusEnum, User,
+    PriorityEnum, TaskStatusEnum,
+)
+from app.r2 import (
+    stream_upload,
+    UploadTooLargeError,
+    MIN_PART_BYTES,
+    create_multipart_upload,
+    presign_upload_part,
+    complete_multipart_upload,
+    abort_multipart_upload,
+    head_object,
+    delete_object,
+)
+from app.concurrency import run_blocking
+from app.multipart_stream import MultipartFileStream
+from app.pagination import encode_cursor, decode_cursor, parse_dt
+from app.stats import global_stats, user_stats
+from app.events import last_event, progress_stream
+from app.search import SEMANTIC_KINDS, search as run_search, semantic_search as run_semantic_search
+from app.schemas import (
+    UploadInitRequest, UploadCompleteRequest, ProcessBatchRequest, TaskBulkUpdateRequest,
+)
 
-from worker.queue import q_long, retry_policy, redis
+from worker.queue import q_default, q_long, retry_policy, redis
+from worker.scheduler import enqueue_unique, queue_metrics, route_many, transcribe_job_id
+from worker import progress
 from worker.jobs.transcribe import transcribe_recording
+from worker.transcription import StubEngine
+from worker.jobs.proxy import extract_audio_proxy
+from worker.jobs.probe import probe_recording
+from worker.jobs.verify import verify_sha256
 
 load_dotenv()
 
@@ -103,6 +131,58 @@ def guess_mime(filename: str, content_type: str | None) -> str:
     return "application/octet-stream"
 
 
+ALLOWED_MIME = {
+    "video/mp4",
+    "audio/mp4",    # common for .m4a from macOS/iOS
+    "audio/x-m4a",
+    "audio/m4a",
+    "audio/mpeg",   # mp3
+    "audio/aac",
+    "audio/x-aac",
+    "audio/wav",
+    "audio/x-wav",
+}
+
+
+def _check_mime(filename: str, content_type: str | None) -> str:
+    """Normalize & validate the upload MIME type; returns the normalized value."""
+    mime = guess_mime(filename, content_type)
+    if mime not in ALLOWED_MIME:
+        raise HTTPException(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported media type: {content_type} (normalized: {mime})",
+        )
+    return mime
+
+
+def _max_upload_bytes() -> int:
+    """Optional max size (bytes). Env override; default 1.5 GB."""
+    try:
+        return int(os.getenv("MAX_UPLOAD_BYTES", str(1_500_000_000)))
+    except ValueError:
+        return 1_500_000_000
+
+
+def _object_key(filename: str) -> str:
+    return f"uploads/{datetime.utcnow():%Y/%m/%d}/{uuid.uuid4()}-{filename}"
+
+
+def _recording_payload(rec: Recording) -> dict:
+    return {
+        "id": rec.id,
+        "filename": rec.filename,
+        "createdAt": rec.created_at.isoformat(),
+        "durationSec": rec.duration_sec,
+        "status": rec.status.value,
+        "fileSize": rec.file_size,
+        "audioCodec": rec.audio_codec,
+        "sampleRate": rec.sample_rate,
+        "channels": rec.channels,
+        "mimeType": rec.mime_type,
+        "sha256": rec.sha256,
+    }
+
+
 def _ensure_user_exists(db: Session, user_id: int) -> None:
     """Week-2 convenience: ensure a placeholder user exists so uploads don't fail on FK."""
     exists = db.query(User.id).filter(User.id == user_id).first()
@@ -111,156 +191,824 @@ def _ensure_user_exists(db: Session, user_id: int) -> None:
         db.commit()
 
 
+# ---- Content-addressed dedup (sha256 + size) ----
+# The first recording of some bytes owns the R2 object; later recordings with the
+# same sha256/size point at that same r2_key instead of keeping a second copy.
+# Only a server-computed hash (sha256_verified) may match across users: a presigned
+# upload's hash is whatever the client claimed until worker.jobs.verify confirms it.
+def _find_duplicate(
+    db: Session,
+    sha: str,
+    size: int,
+    user_id: int | None = None,
+    exclude_id: str | None = None,
+    verified_only: bool = False,
+) -> Recording | None:
+    q = db.query(Recording).filter(
+        Recording.sha256 == sha,
+        Recording.file_size == size,
+        Recording.status.notin_([RecordingStatusEnum.uploading, RecordingStatusEnum.failed]),
+    )
+    if user_id is not None:
+        q = q.filter(Recording.user_id == user_id)
+    if verified_only:
+        q = q.filter(Recording.sha256_verified.is_(True))
+    if exclude_id is not None:
+        q = q.filter(Recording.id != exclude_id)
+    return q.order_by(Recording.created_at.asc()).first()
+
+
+def _reuse_results(db: Session, rec: Recording) -> bool:
+    """
+    Copy transcript + tasks from the same user's finished recording of identical bytes,
+    so the transcribe/summarize pipeline doesn't run again. Returns True if copied.
+    Limited to the same user: results are never shared across accounts. Verified bytes
+    only take results from verified bytes.
+    """
+    q = db.query(Recording).filter(
+        Recording.sha256 == rec.sha256,
+        Recording.file_size == rec.file_size,
+        Recording.user_id == rec.user_id,
+        Recording.id != rec.id,
+        Recording.status == RecordingStatusEnum.ready,
+    )
+    if rec.sha256_verified:
+        q = q.filter(Recording.sha256_verified.is_(True))
+    donor = q.filter(_has_real_summary()).order_by(Recording.created_at.desc()).first()
+    if donor is None or donor.transcript is None:
+        return False
+
+    tx = donor.transcript
+    db.add(Transcript(
+        recording_id=rec.id,
+        text=tx.text,
+        segments=tx.segments,
+        summary=tx.summary,
+        decisions=tx.decisions,
+        questions=tx.questions,
+    ))
+    db.execute(insert(TranscriptSegment).from_select(
+        ["recording_id", "idx", "start_ms", "end_ms", "text"],
+        select(
+            literal(rec.id), TranscriptSegment.idx, TranscriptSegment.start_ms,
+            TranscriptSegment.end_ms, TranscriptSegment.text,
+        ).where(TranscriptSegment.recording_id == donor.id),
+    ))
+    for t in donor.tasks:
+        db.add(Task(
+            recording_id=rec.id,
+            title=t.title,
+            assignee=t.assignee,
+            due_date=t.due_date,
+            priority=t.priority,
+            confidence=t.confidence,
+        ))
+    rec.duration_sec = donor.duration_sec
+    rec.transcribed_at = rec.summarized_at = rec.tasks_extracted_at = datetime.utcnow()
+    rec.status = RecordingStatusEnum.ready
+    return True
+
+
+def _dedupe(db: Session, rec: Recording, reuse: bool) -> str | None:
+    """
+    Point `rec` (already flushed, sha256/file_size final) at an existing object with the
+    same content and optionally reuse its results. Returns the now-orphaned key of the
+    copy we just uploaded, to be deleted AFTER the commit succeeds.
+
+    A server-hashed `rec` only joins other verified rows (any user); a client-asserted
+    hash (presigned uploads) only ever matches the same user's rows, so a forged hash
+    can never hand out someone else's object or point real bytes at a forged one.
+    """
+    orphan = None
+    canonical = _find_duplicate(
+        db, rec.sha256, rec.file_size,
+        user_id=None if rec.sha256_verified else rec.user_id,
+        exclude_id=rec.id,
+        verified_only=rec.sha256_verified,
+    )
+    if canonical is not None and canonical.r2_key != rec.r2_key:
+        orphan = rec.r2_key
+        rec.r2_key = canonical.r2_key
+        # a proxy is derived from its r2_key (jobs/proxy.py); only inherit a checked one
+        rec.audio_r2_key = canonical.audio_r2_key if canonical.sha256_verified else None
+    if canonical is not None:
+        # same bytes, same media metadata: no need to probe again
+        rec.duration_sec = canonical.duration_sec
+        rec.audio_codec = canonical.audio_codec
+        rec.sample_rate = canonical.sample_rate
+        rec.channels = canonical.channels
+    if reuse:
+        _reuse_results(db, rec)
+    return orphan
+
+
+def _after_upload(rec: Recording) -> None:
+    """
+    Background stages that start as soon as the bytes land (never inline). Failing to
+    enqueue them must not fail the upload: each is optional for the pipeline.
+    """
+    try:
+        if not rec.sha256_verified:
+            q_long.enqueue(verify_sha256, rec.id, retry=retry_policy())
+        if rec.duration_sec is None:
+            q_default.enqueue(probe_recording, rec.id, retry=retry_policy())
+        if (
+            rec.mime_type.startswith("video/")
+            and not rec.audio_r2_key
+            and rec.status != RecordingStatusEnum.ready
+            and _parse_bool(os.getenv("AUDIO_PROXY"), True)
+        ):
+            q_default.enqueue(extract_audio_proxy, rec.id, retry=retry_policy())
+    except Exception as e:
+        print(f"[upload] ⚠️ could not enqueue post-upload jobs for {rec.id}: {e}")
+
+
+def _parse_bool(value: str | None, default: bool) -> bool:
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # =========================
 #      Upload endpoint
 # =========================
-@app.post("/recordings")
-async def create_recording(
-    file: UploadFile = File(...),
-    user_id: int = Form(1),  # temporary until auth lands
-    db: Session = Depends(get_db),
-):
-    allowed = {
-        "video/mp4",
-        "audio/mp4",    # common for .m4a from macOS/iOS
-        "audio/x-m4a",
-        "audio/m4a",
-        "audio/mpeg",   # mp3
-        "audio/aac",
-        "audio/x-aac",
-        "audio/wav",
-        "audio/x-wav",
-    }
-
-    # Normalize & validate
-    mime = guess_mime(file.filename, file.content_type)
-    if mime not in allowed:
+@app.post(
+    "/recordings",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "user_id": {"type": "integer", "default": 1},
+                            "reuse_results": {"type": "boolean", "default": True},
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
+async def create_recording(request: Request, db: Session = Depends(get_db)):
+    # Parse the multipart body ourselves: UploadFile would spool the whole file to disk
+    # before we ever see it. Bytes go straight from the socket into an R2 multipart upload.
+    max_bytes = _max_upload_bytes()
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + 64 * 1024:
         raise HTTPException(
-            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            detail=f"Unsupported media type: {file.content_type} (normalized: {mime})",
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File exceeds max allowed size",
         )
 
-    # Optional max size (bytes). Env override; default 1.5 GB.
     try:
-        max_bytes = int(os.getenv("MAX_UPLOAD_BYTES", str(1_500_000_000)))
-    except ValueError:
-        max_bytes = 1_500_000_000
+        form = MultipartFileStream(request, field="file")
+        await form.open()
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    # Stream to temp file while hashing (O(1) memory)
-    hasher = sha256()
-    total = 0
-    try:
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            tmp_path = tmp.name
-            while True:
-                chunk = await file.read(1024 * 1024)  # 1 MB
-                if not chunk:
-                    break
-                total += len(chunk)
-                if total > max_bytes:
-                    raise HTTPException(
-                        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                        detail="File exceeds max allowed size",
-                    )
-                hasher.update(chunk)
-                tmp.write(chunk)
-    finally:
-        await file.close()
+    filename = form.filename
+    mime = _check_mime(filename, form.content_type)
+    key = _object_key(filename)
 
-    sha = hasher.hexdigest()
-    key = f"uploads/{datetime.utcnow():%Y/%m/%d}/{uuid.uuid4()}-{file.filename}"
+    # Single pass: hash + size while multipart-uploading to R2 with normalized MIME
+    try:
+        total, sha = await stream_upload(form.chunks(), key, content_type=mime, max_bytes=max_bytes)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File exceeds max allowed size",
+        )
 
-    # Upload to R2 with normalized MIME
     try:
-        with open(tmp_path, "rb") as fh:
-            upload_fileobj(fh, key, content_type=mime)
-    finally:
-        try:
-            os.remove(tmp_path)
-        except FileNotFoundError:
-            pass
+        user_id = int(form.fields.get("user_id", "1"))  # temporary until auth lands
+    except ValueError:
+        await run_blocking(delete_object, key)
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail="user_id must be an integer")
 
+    # SQLAlchemy + boto3 are blocking: run the whole persist step on the upload pool
+    rec = await run_blocking(
+        _persist_upload,
+        db,
+        user_id=user_id,
+        filename=filename,
+        mime=mime,
+        size=total,
+        sha=sha,
+        key=key,
+        reuse=_parse_bool(form.fields.get("reuse_results"), True),
+    )
+    return _recording_payload(rec)
+
+
+def _persist_upload(
+    db: Session, user_id: int, filename: str, mime: str, size: int, sha: str, key: str, reuse: bool
+) -> Recording:
     _ensure_user_exists(db, user_id)
 
     # Persist metadata
     rec = Recording(
         user_id=user_id,
-        filename=file.filename,
+        filename=filename,
         mime_type=mime,       # use normalized value
-        file_size=total,
+        file_size=size,
         sha256=sha,
+        sha256_verified=True,  # hashed by stream_upload, not taken from the client
         r2_key=key,
         status=RecordingStatusEnum.uploaded,
     )
     db.add(rec)
+    db.flush()
+    orphan = _dedupe(db, rec, reuse=reuse)
+    db.commit()
+    db.refresh(rec)
+    if orphan:
+        delete_object(orphan)
+    _after_upload(rec)
+    return rec
+
+
+# =========================
+#  Direct-to-R2 uploads
+# =========================
+# Two-phase flow so media bytes never pass through the API process:
+#   1) POST /recordings/uploads            -> recording row + presigned part URLs
+#   2) client PUTs each part straight to R2, keeping the ETag response headers
+#   3) POST /recordings/{rid}/upload/complete -> finalize, record size + checksum
+# DELETE /recordings/{rid}/upload aborts and drops the uploaded parts.
+MAX_PARTS = 10_000
+
+
+def _part_size(file_size: int) -> int:
+    try:
+        part = int(os.getenv("UPLOAD_PART_BYTES", str(64 * 1024 * 1024)))
+    except ValueError:
+        part = 64 * 1024 * 1024
+    part = max(part, MIN_PART_BYTES)
+    # grow parts if the file would need more than MAX_PARTS of them
+    return max(part, -(-file_size // MAX_PARTS))
+
+
+def _presign_ttl() -> int:
+    try:
+        return int(os.getenv("UPLOAD_URL_TTL_SEC", "3600"))
+    except ValueError:
+        return 3600
+
+
+def _pending_upload(db: Session, rid: str) -> Recording:
+    rec = db.query(Recording).filter(Recording.id == rid).first()
+    if not rec:
+        raise HTTPException(404, "Recording not found")
+    if rec.status != RecordingStatusEnum.uploading or not rec.upload_id:
+        raise HTTPException(status.HTTP_409_CONFLICT, "Recording has no upload in progress")
+    return rec
+
+
+@app.post("/recordings/uploads", status_code=status.HTTP_201_CREATED)
+def init_upload(body: UploadInitRequest, db: Session = Depends(get_db)):
+    mime = _check_mime(body.filename, body.content_type)
+    if body.file_size > _max_upload_bytes():
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File exceeds max allowed size",
+        )
+
+    _ensure_user_exists(db, body.user_id)
+
+    # Same bytes already uploaded by this user? Skip the transfer entirely.
+    if body.sha256 and _find_duplicate(db, body.sha256.lower(), body.file_size, user_id=body.user_id):
+        rec = Recording(
+            user_id=body.user_id,
+            filename=body.filename,
+            mime_type=mime,
+            file_size=body.file_size,
+            sha256=body.sha256.lower(),
+            r2_key="",  # filled in by _dedupe
+            status=RecordingStatusEnum.uploaded,
+            upload_started_at=datetime.utcnow(),
+            upload_completed_at=datetime.utcnow(),
+        )
+        db.add(rec)
+        db.flush()
+        _dedupe(db, rec, reuse=body.reuse_results)
+        db.commit()
+        db.refresh(rec)
+        _after_upload(rec)
+        return {"id": rec.id, "deduplicated": True, "parts": [], "recording": _recording_payload(rec)}
+
+    key = _object_key(body.filename)
+    part_size = _part_size(body.file_size)
+    part_count = -(-body.file_size // part_size)
+    ttl = _presign_ttl()
+
+    upload_id = create_multipart_upload(key, content_type=mime)
+    parts = [
+        {"partNumber": n, "url": presign_upload_part(key, upload_id, n, expires_in=ttl)}
+        for n in range(1, part_count + 1)
+    ]
+
+    rec = Recording(
+        user_id=body.user_id,
+        filename=body.filename,
+        mime_type=mime,
+        file_size=body.file_size,          # declared; replaced by the real size on complete
+        sha256=(body.sha256 or "").lower(),
+        r2_key=key,
+        upload_id=upload_id,
+        upload_started_at=datetime.utcnow(),
+        status=RecordingStatusEnum.uploading,
+    )
+    db.add(rec)
     db.commit()
     db.refresh(rec)
 
     return {
         "id": rec.id,
-        "filename": rec.filename,
-        "createdAt": rec.created_at.isoformat(),
-        "durationSec": rec.duration_sec,
-        "status": rec.status.value,
-        "fileSize": rec.file_size,
-        "mimeType": rec.mime_type,
-        "sha256": rec.sha256,
+        "deduplicated": False,
+        "uploadId": upload_id,
+        "key": key,
+        "partSize": part_size,
+        "parts": parts,
+        "expiresIn": ttl,
     }
 
 
+@app.post("/recordings/{rid}/upload/complete")
+def complete_upload(rid: str, body: UploadCompleteRequest, db: Session = Depends(get_db)):
+    rec = _pending_upload(db, rid)
+
+    sha = (body.sha256 or rec.sha256 or "").lower()
+    if not sha:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="sha256 is required (send it on init or complete)",
+        )
+
+    try:
+        complete_multipart_upload(
+            rec.r2_key,
+            rec.upload_id,
+            [{"PartNumber": p.part_number, "ETag": p.etag} for p in body.parts],
+        )
+    except (BotoCoreError, ClientError) as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=f"Could not complete upload: {e}")
+
+    # Trust R2 for the size, not the client's declaration
+    size = int(head_object(rec.r2_key)["ContentLength"])
+    if size > _max_upload_bytes():
+        delete_object(rec.r2_key)
+        rec.status = RecordingStatusEnum.failed
+        rec.upload_id = None
+        db.commit()
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File exceeds max allowed size",
+        )
+
+    rec.file_size = size
+    rec.sha256 = sha
+    rec.upload_id = None
+    rec.upload_completed_at = datetime.utcnow()
+    rec.status = RecordingStatusEnum.uploaded
+    orphan = _dedupe(db, rec, reuse=body.reuse_results)
+    db.commit()
+    db.refresh(rec)
+    if orphan:
+        delete_object(orphan)
+    _after_upload(rec)
+
+    return _recording_payload(rec)
+
+
+@app.delete("/recordings/{rid}/upload")
+def abort_upload(rid: str, db: Session = Depends(get_db)):
+    rec = _pending_upload(db, rid)
+    abort_multipart_upload(rec.r2_key, rec.upload_id)
+    db.delete(rec)
+    db.commit()
+    return {"ok": True}
+
+
 @app.get("/recordings")
-def list_recordings(limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
-    rows = (
-        db.query(Recording)
-        .order_by(Recording.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+def list_recordings(
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = 0,
+    cursor: str | None = None,
+    user_id: int | None = None,
+    status_filter: RecordingStatusEnum | None = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+):
+    """
+    Newest first. Two modes:
+      - offset (legacy): no `cursor` param -> bare list
+      - keyset: `cursor=` (empty for the first page, then the returned `nextCursor`)
+        -> {"items": [...], "nextCursor": str | null}; pages on (created_at, id) so
+        deep pages cost the same as the first one.
+    """
+    # Column projection: plain Rows, no ORM entities / identity map for list pages
+    q = select(*RECORDING_LIST_COLUMNS)
+    if user_id is not None:
+        q = q.where(Recording.user_id == user_id)
+    if status_filter is not None:
+        q = q.where(Recording.status == status_filter)
+
+    if cursor is None:
+        rows = db.execute(
+            q.order_by(Recording.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        ).all()
+        return [_recording_list_item(r) for r in rows]
+
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor, 2)
+            created_at = parse_dt(created_at)
+        except ValueError as e:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
+        q = q.where(tuple_(Recording.created_at, Recording.id) < tuple_(created_at, last_id))
+
+    rows = db.execute(
+        q.order_by(Recording.created_at.desc(), Recording.id.desc())
+        .limit(limit + 1)  # one extra row tells us whether there is a next page
+    ).all()
+    page = rows[:limit]
+    next_cursor = (
+        encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
     )
-    return [
-        {
-            "id": r.id,
-            "filename": r.filename,
-            "createdAt": r.created_at.isoformat(),
-            "durationSec": r.duration_sec,
-            "status": r.status.value,
-        }
-        for r in rows
-    ]
+    return {"items": [_recording_list_item(r) for r in page], "nextCursor": next_cursor}
+
+
+RECORDING_LIST_COLUMNS = (
+    Recording.id,
+    Recording.filename,
+    Recording.created_at,
+    Recording.duration_sec,
+    Recording.status,
+)
+
+
+def _recording_list_item(r) -> dict:
+    """Serialize a RECORDING_LIST_COLUMNS row (or a Recording; same attribute names)."""
+    return {
+        "id": r.id,
+        "filename": r.filename,
+        "createdAt": r.created_at.isoformat(),
+        "durationSec": r.duration_sec,
+        "status": r.status.value,
+    }
+
+
+RECORDING_INCLUDES = {"transcript", "transcript.text", "tasks"}
+
+
+def _json_list(value: str | None) -> list | None:
+    """decisions/questions are stored as JSON-stringified lists for now."""
+    if not value:
+        return None
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return [value]
+    return parsed if isinstance(parsed, list) else [parsed]
+
+
+TASK_COLUMNS = (
+    Task.id,
+    Task.recording_id,
+    Task.title,
+    Task.assignee,
+    Task.due_date,
+    Task.priority,
+    Task.status,
+    Task.confidence,
+)
+
+
+def _task_payload(t) -> dict:
+    """Serialize a Task or a TASK_COLUMNS row."""
+    return {
+        "id": t.id,
+        "recordingId": t.recording_id,
+        "title": t.title,
+        "assignee": t.assignee,
+        "dueDate": t.due_date.isoformat() if t.due_date else None,
+        "priority": t.priority.value if t.priority else None,
+        "status": t.status.value,
+        "confidence": t.confidence,
+    }
 
 
 @app.get("/recordings/{rid}")
-def get_recording(rid: str, db: Session = Depends(get_db)):
-    r = db.query(Recording).filter(Recording.id == rid).first()
+def get_recording(rid: str, include: str | None = None, db: Session = Depends(get_db)):
+    """
+    Recording detail in a single query (transcript/tasks are JOINed in).
+
+    `include` is a comma-separated list:
+      transcript       summary, decisions, questions
+      transcript.text  the above plus the full transcript text (large; only when asked)
+      tasks            the recording's tasks (same shape as /recordings/{rid}/tasks)
+    Without it, only `summary` is added next to the recording fields.
+    """
+    parts = {p.strip() for p in (include or "").split(",") if p.strip()}
+    unknown = parts - RECORDING_INCLUDES
+    if unknown:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}",
+        )
+    with_text = "transcript.text" in parts
+    with_transcript = with_text or "transcript" in parts
+
+    tx_cols = [Transcript.summary]
+    if with_transcript:
+        tx_cols += [Transcript.decisions, Transcript.questions]
+    if with_text:
+        tx_cols.append(Transcript.text)
+    options = [joinedload(Recording.transcript).load_only(*tx_cols)]
+    if "tasks" in parts:
+        options.append(joinedload(Recording.tasks))
+
+    r = db.query(Recording).options(*options).filter(Recording.id == rid).first()
     if not r:
         raise HTTPException(404, "Recording not found")
-    tr = db.query(Transcript).filter(Transcript.recording_id == rid).first()
-    return {
+    tr = r.transcript
+    out = {
         "id": r.id,
         "filename": r.filename,
         "createdAt": r.created_at.isoformat(),
         "durationSec": r.duration_sec,
         "status": r.status.value,
+        "audioCodec": r.audio_codec,
+        "sampleRate": r.sample_rate,
+        "channels": r.channels,
         "summary": tr.summary if tr else None,
     }
+    if with_transcript:
+        out["transcript"] = None
+        if tr is not None:
+            out["transcript"] = {
+                "summary": tr.summary,
+                "decisions": _json_list(tr.decisions),
+                "questions": _json_list(tr.questions),
+            }
+            if with_text:
+                out["transcript"]["text"] = tr.text
+    if "tasks" in parts:
+        out["tasks"] = [_task_payload(t) for t in r.tasks]
+    return out
+
+
+def _status_event(db: Session, rid: str) -> dict:
+    """Progress-event-shaped snapshot from the DB, for recordings with no event in Redis."""
+    try:
+        row = db.execute(select(Recording.status).where(Recording.id == rid)).first()
+    finally:
+        db.close()  # return the connection now, not when the (long) stream ends
+    if row is None:
+        raise HTTPException(404, "Recording not found")
+    stage = {"ready": "done", "failed": "failed", "processing": "transcribing"}
+    return progress.event(rid, stage.get(row.status.value, row.status.value), row.status.value)
+
+
+@app.get("/recordings/{rid}/events")
+async def recording_events(rid: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Server-sent `progress` events ({recordingId, stage, status, percent, at}) pushed by
+    the workers through Redis pub/sub; the stream closes after `ready` or `failed`.
+    Replaces polling GET /recordings/{rid}: Postgres is read at most once per stream.
+    """
+    initial = await last_event(rid)
+    if initial is None:
+        initial = await run_blocking(_status_event, db, rid)
+    return StreamingResponse(
+        progress_stream(request, rid, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/recordings/{rid}/segments")
+def get_segments(
+    rid: str,
+    from_sec: float = Query(0, ge=0),
+    to_sec: float | None = Query(None, gt=0),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Transcript segments overlapping [from_sec, to_sec), in time order, paged by
+    `nextCursor`. Available while transcription is still running: `complete` is false
+    until the whole recording has been transcribed.
+    """
+    rec = db.execute(
+        select(Recording.id, Recording.transcribed_at).where(Recording.id == rid)
+    ).first()
+    if not rec:
+        raise HTTPException(404, "Recording not found")
+
+    q = select(
+        TranscriptSegment.idx, TranscriptSegment.start_ms,
+        TranscriptSegment.end_ms, TranscriptSegment.text,
+    ).where(
+        TranscriptSegment.recording_id == rid,
+        TranscriptSegment.end_ms > int(from_sec * 1000),
+    )
+    if to_sec is not None:
+        q = q.where(TranscriptSegment.start_ms < int(to_sec * 1000))
+    if cursor:
+        try:
+            (last_idx,) = decode_cursor(cursor, 1)
+        except ValueError as e:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
+        q = q.where(TranscriptSegment.idx > last_idx)
+
+    rows = db.execute(q.order_by(TranscriptSegment.idx).limit(limit + 1)).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].idx) if len(rows) > limit else None
+    return {
+        "items": [
+            {"idx": r.idx, "startSec": r.start_ms / 1000, "endSec": r.end_ms / 1000, "text": r.text}
+            for r in page
+        ],
+        "nextCursor": next_cursor,
+        "complete": rec.transcribed_at is not None,
+    }
 
 
 @app.get("/recordings/{rid}/tasks")
 def get_tasks(rid: str, db: Session = Depends(get_db)):
-    tasks = db.query(Task).filter(Task.recording_id == rid).all()
-    return [
-        {
-            "id": t.id,
-            "recordingId": t.recording_id,
-            "title": t.title,
-            "assignee": t.assignee,
-            "dueDate": t.due_date.isoformat() if t.due_date else None,
-            "priority": t.priority.value if t.priority else None,
-            "status": t.status.value,
-            "confidence": t.confidence,
-        }
-        for t in tasks
-    ]
+    rows = db.execute(select(*TASK_COLUMNS).where(Task.recording_id == rid)).all()
+    return [_task_payload(t) for t in rows]
+
+@app.get("/tasks")
+def list_tasks(
+    assignee: str | None = None,
+    status_filter: list[TaskStatusEnum] | None = Query(None, alias="status"),
+    priority: PriorityEnum | None = None,
+    due_after: datetime | None = None,
+    due_before: datetime | None = None,
+    user_id: int | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Tasks across recordings, soonest due first (undated last), keyset-paged with
+    `nextCursor`. `status` may repeat (e.g. status=todo&status=doing); the due range
+    is [due_after, due_before). `user_id` scopes to that user's recordings.
+    Backed by ix_tasks_assignee_status_due_id / ix_tasks_status_due_id.
+    """
+    q = select(*TASK_COLUMNS)
+    if user_id is not None:
+        q = q.join(Recording, Recording.id == Task.recording_id).where(Recording.user_id == user_id)
+    if assignee is not None:
+        q = q.where(Task.assignee == assignee)
+    if status_filter:
+        q = q.where(Task.status.in_(status_filter))
+    if priority is not None:
+        q = q.where(Task.priority == priority)
+    if due_after is not None:
+        q = q.where(Task.due_date >= due_after)
+    if due_before is not None:
+        q = q.where(Task.due_date < due_before)
+
+    if cursor:
+        try:
+            last_due, last_id = decode_cursor(cursor, 2)
+            last_due = parse_dt(last_due)
+        except ValueError as e:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if last_due is None:
+            # already into the undated tail
+            q = q.where(Task.due_date.is_(None), Task.id > last_id)
+        else:
+            q = q.where(or_(
+                tuple_(Task.due_date, Task.id) > tuple_(last_due, last_id),
+                Task.due_date.is_(None),
+            ))
+
+    rows = db.execute(
+        q.order_by(Task.due_date.asc().nulls_last(), Task.id.asc())
+        .limit(limit + 1)  # one extra row tells us whether there is a next page
+    ).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].due_date, page[-1].id) if len(rows) > limit else None
+    return {"items": [_task_payload(t) for t in page], "nextCursor": next_cursor}
+
+@app.patch("/tasks")
+def update_tasks(body: TaskBulkUpdateRequest, db: Session = Depends(get_db)):
+    """Set status and/or priority on many tasks in one UPDATE ... RETURNING."""
+    values = body.model_dump(include={"status", "priority"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Nothing to update (status or priority)")
+    rows = db.execute(
+        update(Task)
+        .where(Task.id.in_(set(body.ids)))
+        .values(**values)
+        .returning(*TASK_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    found = {r.id for r in rows}
+    return {
+        "updated": len(rows),
+        "items": [_task_payload(t) for t in rows],
+        "missingIds": [i for i in body.ids if i not in found],
+    }
+
+# Statuses processing may (re)start from: never in-flight uploads/processing or finished work
+PROCESSABLE_STATUSES = (
+    RecordingStatusEnum.queued,
+    RecordingStatusEnum.failed,
+    RecordingStatusEnum.uploaded,
+    RecordingStatusEnum.transcribed,
+    RecordingStatusEnum.summarized,
+    RecordingStatusEnum.error,
+)
+
+
+# The pre-pipeline MVP stub jobs marked stages done without producing anything: the
+# transcript was "(transcription pending)" with no engine label (Transcript.model) and
+# the summary this placeholder. Such marks must not count as finished work, and
+# neither do runs of the stub engine (TRANSCRIBE_ENGINE=stub, Transcript.model "stub").
+LEGACY_STUB_SUMMARY = "Summary pending (MVP stub)."
+
+
+def _real_engine():
+    return Transcript.model.isnot(None) & (Transcript.model != StubEngine.name)
+
+
+def _has_real_transcript():
+    """Correlated EXISTS: the recording's transcript came from a real transcription engine."""
+    return exists().where(
+        Transcript.recording_id == Recording.id,
+        _real_engine(),
+    )
+
+
+def _has_real_summary():
+    """Correlated EXISTS: real transcript and a summary that isn't the stub placeholder."""
+    return exists().where(
+        Transcript.recording_id == Recording.id,
+        _real_engine(),
+        Transcript.summary.isnot(None),
+        Transcript.summary != LEGACY_STUB_SUMMARY,
+    )
+
+
+# Columns the scheduler routes on (worker.scheduler.route)
+ROUTE_COLUMNS = (
+    Recording.id, Recording.user_id, Recording.duration_sec,
+    Recording.file_size, Recording.mime_type,
+)
+
+
+def _claim_for_processing(db: Session, where) -> list:
+    """
+    Compare-and-set every matching row into `queued` in one statement; only rows still
+    in PROCESSABLE_STATUSES move, so of two racing requests exactly one wins each row.
+
+    Stage marks without real results behind them (legacy stub runs) are cleared in the
+    same statement, so the jobs' resume checks only ever skip work that was really done.
+    """
+    real_tx, real_summary = _has_real_transcript(), _has_real_summary()
+    rows = db.execute(
+        update(Recording)
+        .where(where, Recording.status.in_(PROCESSABLE_STATUSES))
+        .values(
+            status=RecordingStatusEnum.queued,
+            transcribed_at=case((real_tx, Recording.transcribed_at), else_=null()),
+            summarized_at=case((real_summary, Recording.summarized_at), else_=null()),
+            tasks_extracted_at=case((real_summary, Recording.tasks_extracted_at), else_=null()),
+        )
+        .returning(*ROUTE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return rows
+
+
+def _enqueue_transcriptions(rows) -> tuple:
+    """Route + enqueue (idempotently) a transcription per row; returns (routes, {job_id: new})."""
+    routes = route_many(rows)
+    enqueued = enqueue_unique(
+        [(r, (row.id,), transcribe_job_id(row.id)) for r, row in zip(routes, rows)],
+        transcribe_recording,
+        retry=retry_policy(),
+    )
+    progress.publish_many(
+        progress.event(row.id, "queued", RecordingStatusEnum.queued.value, queue=r.queue)
+        for r, row in zip(routes, rows)
+        if enqueued[transcribe_job_id(row.id)]
+    )
+    return routes, enqueued
+
 
 @app.post("/recordings/{recording_id}/process")
 def trigger_processing(recording_id: str, db: Session = Depends(get_db)):
@@ -268,34 +1016,128 @@ def trigger_processing(recording_id: str, db: Session = Depends(get_db)):
     if not rec:
         raise HTTPException(status_code=404, detail="Recording not found")
 
-    # Normalize legacy statuses to queued so the pipeline can run
-    legacy_statuses = {
-        RecordingStatusEnum.uploaded,
-        RecordingStatusEnum.transcribed,
-        RecordingStatusEnum.summarized,
-        RecordingStatusEnum.error,
-    }
-    if rec.status in legacy_statuses:
-        rec.status = RecordingStatusEnum.queued
-        db.commit()
+    if rec.status == RecordingStatusEnum.uploading:
+        raise HTTPException(status_code=409, detail="Upload not completed yet")
 
-    # If it’s already processing or ready, don’t enqueue again
-    if rec.status in (RecordingStatusEnum.processing, RecordingStatusEnum.ready):
+    # Legacy statuses and failed runs go back to queued; processing/ready don't match,
+    # so a concurrent or repeated click can't start a second run
+    rows = _claim_for_processing(db, Recording.id == recording_id)
+    if not rows:
+        db.refresh(rec)
         return {"ok": True, "status": rec.status.value, "jobId": None}
 
-    # Enqueue the transcription job (MVP stub for now)
-    job = q_long.enqueue(transcribe_recording, recording_id, retry=retry_policy())
-    return {"ok": True, "status": rec.status.value, "jobId": job.get_id()}
+    # Queue class + timeout from the (probed or estimated) duration and user fair-share;
+    # the deterministic job id folds a still-queued earlier request into this one
+    routes, enqueued = _enqueue_transcriptions(rows)
+    job_id = transcribe_job_id(recording_id)
+    return {
+        "ok": True,
+        "status": RecordingStatusEnum.queued.value,
+        "jobId": job_id,
+        "queue": routes[0].queue,
+        "deduplicated": not enqueued[job_id],
+    }
+
+@app.post("/recordings/process")
+def trigger_processing_batch(body: ProcessBatchRequest, db: Session = Depends(get_db)):
+    """
+    Start processing many recordings at once: one set-based UPDATE ... RETURNING moves
+    every eligible row to `queued`, then all transcription jobs are enqueued in a single
+    Redis round-trip. Give either `ids` or a `status` to backfill (oldest first, up to
+    `limit` per call; call again until `count` is 0). Ineligible ids are skipped.
+    """
+    if (body.ids is None) == (body.status is None):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Give exactly one of ids or status")
+    if body.status is not None and body.status not in PROCESSABLE_STATUSES:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail=f"Status must be one of {', '.join(s.value for s in PROCESSABLE_STATUSES)}",
+        )
+
+    if body.ids is not None:
+        target = Recording.id.in_(set(body.ids))
+    else:
+        # SKIP LOCKED: concurrent backfill calls take disjoint pages instead of blocking
+        picked = select(Recording.id).where(Recording.status == body.status)
+        if body.user_id is not None:
+            picked = picked.where(Recording.user_id == body.user_id)
+        picked = (
+            picked.order_by(Recording.created_at.asc())
+            .limit(body.limit)
+            .with_for_update(skip_locked=True)
+        )
+        target = Recording.id.in_(picked.scalar_subquery())
+
+    rows = _claim_for_processing(db, target)
+    routes, enqueued = _enqueue_transcriptions(rows) if rows else ([], {})
+
+    by_queue: dict = {}
+    for r in routes:
+        by_queue[r.queue] = by_queue.get(r.queue, 0) + 1
+    return {
+        "ok": True,
+        "count": len(rows),
+        "ids": [row.id for row in rows],
+        "jobIds": list(enqueued),
+        "deduplicated": sum(1 for new in enqueued.values() if not new),
+        "queues": by_queue,
+    }
+
+@app.get("/search")
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    user_id: int | None = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """
+    Full-text search over transcripts and task titles (websearch syntax: "phrases",
+    OR, -word). Recording hits are ranked and carry highlighted snippets with segment
+    timestamps; task hits carry a highlighted title. "approximate" is true when a term
+    matched more rows than SEARCH_MAX_CANDIDATES and was ranked within that subset.
+    """
+    return run_search(db, q, user_id=user_id, limit=limit)
+
+@app.get("/search/semantic")
+def search_semantic(
+    q: str = Query(..., min_length=1, max_length=500),
+    user_id: int | None = None,
+    kind: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Meaning-based search over transcript passages (with timestamps) and task titles,
+    nearest first by cosine similarity (`score`). `kind` = segment | task.
+    """
+    if kind is not None and kind not in SEMANTIC_KINDS:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail=f"kind must be one of {', '.join(SEMANTIC_KINDS)}",
+        )
+    return run_semantic_search(db, q, user_id=user_id, limit=limit, kind=kind)
 
 @app.get("/stats")
-def stats(db: Session = Depends(get_db)):
-    recs = db.query(func.count(Recording.id)).scalar() or 0
-    tasks = db.query(func.count(Task.id)).scalar() or 0
-    return {"recordings": recs, "tasks": tasks}
+def stats(exact: bool = False, user_id: int | None = None, db: Session = Depends(get_db)):
+    """
+    Recording/task counts with a per-status breakdown, cached in Redis (STATS_TTL_SEC).
+    Global numbers are planner estimates unless `exact=true`; `user_id` scopes to one user.
+    """
+    if user_id is not None:
+        return user_stats(db, user_id, exact=exact)
+    return global_stats(db, exact=exact)
 
 @app.get("/healthz/worker")
 def worker_health():
     try:
         return {"redis": bool(redis.ping())}
     except Exception as e:
-        return {"redis": False, "error": str(e)}
\ No newline at end of file
+        return {"redis": False, "error": str(e)}
+
+@app.get("/healthz/queues")
+def queue_health():
+    """Backlog, outcome counts and mean queue-wait/run seconds per queue class."""
+    try:
+        return {"queues": queue_metrics()}
+    except Exception as e:
+        return {"queues": None, "error": str(e)}
\ No newline at end of file
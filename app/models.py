@@ -5,12 +5,18 @@ from datetime import datetime
 from typing import Optional, List
 import enum
 import uuid
-from sqlalchemy.dialects.postgresql import ENUM as PGEnum
-from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Enum
+from sqlalchemy.dialects.postgresql import ENUM as PGEnum, JSONB, TSVECTOR
+from sqlalchemy import (
+    Boolean, String, Integer, DateTime, Text, ForeignKey, Enum, Index, UniqueConstraint, Computed, false,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from pgvector.sqlalchemy import Vector
 
 from app.db import Base
 
+# Width of Embedding.embedding; must match worker.embeddings.EMBED_DIM and the migration
+EMBED_DIM = 384
+
 
 # ===== Enums =====
 class PriorityEnum(str, enum.Enum):
@@ -31,6 +37,8 @@ class RecordingStatusEnum(str, enum.Enum):
     processing = "processing"
     ready = "ready"
     failed = "failed"
+    # direct-to-R2 multipart upload still in flight
+    uploading = "uploading"
     # legacy states (seen in prod)
     uploaded = "uploaded"
     transcribed = "transcribed"
@@ -38,6 +46,15 @@ class RecordingStatusEnum(str, enum.Enum):
     error = "error"
 
 
+def _search_tsv(source: str):
+    """Generated full-text column (GIN-indexed); never loaded unless asked for."""
+    return mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('english'::regconfig, coalesce({source}, ''))", persisted=True),
+        deferred=True,
+    )
+
+
 # ===== Models =====
 class User(Base):
     __tablename__ = "users"
@@ -67,17 +84,38 @@ class Recording(Base):
     mime_type: Mapped[str] = mapped_column(String(128), nullable=False)
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)  # bytes
     sha256: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
-    r2_key: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    # True once the server hashed the stored bytes itself (streamed upload, or the
+    # post-upload check of a presigned one). Only verified rows are shared across users.
+    sha256_verified: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default=false(), nullable=False
+    )
+    # Not unique: recordings with identical bytes (sha256 + size) share one object
+    r2_key: Mapped[str] = mapped_column(String(512), nullable=False, index=True)
+    # Direct-to-R2 multipart uploads (cleared once the upload is completed/aborted)
+    upload_id: Mapped[Optional[str]] = mapped_column(String(1024))
+    upload_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    upload_completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    # Compact audio-only proxy (Opus) extracted from video uploads; transcription prefers it
+    audio_r2_key: Mapped[Optional[str]] = mapped_column(String(512))
 
     # Processing/status
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     duration_sec: Mapped[Optional[int]] = mapped_column(Integer)
+    # Audio stream metadata from the post-upload probe (ffprobe, no decode)
+    audio_codec: Mapped[Optional[str]] = mapped_column(String(64))
+    sample_rate: Mapped[Optional[int]] = mapped_column(Integer)
+    channels: Mapped[Optional[int]] = mapped_column(Integer)
     status: Mapped[RecordingStatusEnum] = mapped_column(
         PGEnum(RecordingStatusEnum, name="recordingstatusenum", create_type=False),
         server_default="queued",   # server-side default; matches the enum label
         nullable=False,
         index=True,
     )
+    # Pipeline stage checkpoints (phase-2 columns): a retry skips stages already done
+    transcribed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    summarized_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    tasks_extracted_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    error_log: Mapped[Optional[str]] = mapped_column(Text)
 
     # Relationships
     owner: Mapped["User"] = relationship(back_populates="recordings")
@@ -89,12 +127,44 @@ class Recording(Base):
     )
 
 
+# Keyset pagination for GET /recordings: newest-first, per user and globally
+Index(
+    "ix_recordings_user_created_id",
+    Recording.user_id, Recording.created_at.desc(), Recording.id.desc(),
+)
+Index("ix_recordings_created_id", Recording.created_at.desc(), Recording.id.desc())
+
+
+class RecordingCheckpoint(Base):
+    """
+    Durable partial progress inside a pipeline stage, so a retried job resumes where the
+    failed one stopped (e.g. stage "transcribe_chunk": one row per decoded chunk).
+    Rows are dropped once the stage's own result is committed.
+    """
+    __tablename__ = "recording_checkpoints"
+    __table_args__ = (UniqueConstraint("recording_id", "stage", "chunk_index"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    recording_id: Mapped[str] = mapped_column(
+        ForeignKey("recordings.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    stage: Mapped[str] = mapped_column(String(32), nullable=False)
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    artifact_key: Mapped[Optional[str]] = mapped_column(String(512))  # R2 object, if any
+    data: Mapped[Optional[dict]] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class Transcript(Base):
     __tablename__ = "transcripts"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     recording_id: Mapped[str] = mapped_column(ForeignKey("recordings.id"), unique=True, index=True)
-    text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Large columns are deferred: loaded only on access or with undefer()/load_only()
+    text: Mapped[str] = mapped_column(Text, nullable=False, deferred=True)
+    segments: Mapped[Optional[list]] = mapped_column(JSONB, deferred=True)
+    model: Mapped[Optional[str]] = mapped_column(Text)      # e.g. "faster-whisper:small"
+    language: Mapped[Optional[str]] = mapped_column(Text)
     summary: Mapped[Optional[str]] = mapped_column(Text)
     decisions: Mapped[Optional[str]] = mapped_column(Text)   # JSON stringified list for now
     questions: Mapped[Optional[str]] = mapped_column(Text)   # JSON stringified list
@@ -103,6 +173,27 @@ class Transcript(Base):
     recording: Mapped["Recording"] = relationship(back_populates="transcript")
 
 
+class TranscriptSegment(Base):
+    """
+    One decoded segment, written per chunk while transcription runs, so a transcript can
+    be read (and paged by time) before it's finished and without loading the whole blob.
+    """
+    __tablename__ = "transcript_segments"
+
+    recording_id: Mapped[str] = mapped_column(
+        ForeignKey("recordings.id", ondelete="CASCADE"), primary_key=True
+    )
+    idx: Mapped[int] = mapped_column(Integer, primary_key=True)  # 0-based, in time order
+    start_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    search_tsv: Mapped[Optional[str]] = _search_tsv("text")
+
+
+# Time-range reads: WHERE recording_id = ? AND start_ms < ? AND end_ms > ?
+Index("ix_transcript_segments_recording_start", TranscriptSegment.recording_id, TranscriptSegment.start_ms)
+
+
 class Task(Base):
     __tablename__ = "tasks"
 
@@ -115,5 +206,50 @@ class Task(Base):
     status: Mapped[TaskStatusEnum] = mapped_column(Enum(TaskStatusEnum), default=TaskStatusEnum.todo, nullable=False)
     confidence: Mapped[Optional[float]] = mapped_column()
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    search_tsv: Mapped[Optional[str]] = _search_tsv("title")
 
     recording: Mapped["Recording"] = relationship(back_populates="tasks")
+
+
+# Full-text search (GET /search)
+Index("ix_transcript_segments_search_tsv", TranscriptSegment.search_tsv, postgresql_using="gin")
+Index("ix_tasks_search_tsv", Task.search_tsv, postgresql_using="gin")
+
+# GET /tasks: filters + ORDER BY due_date ASC NULLS LAST, id (btree ASC puts NULLs last)
+Index("ix_tasks_assignee_status_due_id", Task.assignee, Task.status, Task.due_date, Task.id)
+Index("ix_tasks_status_due_id", Task.status, Task.due_date, Task.id)
+
+
+class Embedding(Base):
+    """
+    Semantic-search vectors (pgvector, float32) for transcript passages (kind "segment":
+    ref_id = first transcript_segments.idx of the window) and task titles (kind "task":
+    ref_id = task_id = tasks.id, so deleting a task drops its vector). `model` keeps
+    vectors of different backends apart.
+    """
+    __tablename__ = "embeddings"
+    __table_args__ = (UniqueConstraint("recording_id", "kind", "ref_id", "model"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    recording_id: Mapped[str] = mapped_column(
+        ForeignKey("recordings.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    ref_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    task_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("tasks.id", ondelete="CASCADE"), index=True
+    )
+    start_ms: Mapped[Optional[int]] = mapped_column(Integer)
+    end_ms: Mapped[Optional[int]] = mapped_column(Integer)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    model: Mapped[str] = mapped_column(String(128), nullable=False)
+    embedding = mapped_column(Vector(EMBED_DIM), nullable=False)
+
+
+# Approximate nearest neighbours by cosine distance (ORDER BY embedding <=> :q)
+Index(
+    "ix_embeddings_embedding_hnsw", Embedding.embedding,
+    postgresql_using="hnsw",
+    postgresql_with={"m": 16, "ef_construction": 64},
+    postgresql_ops={"embedding": "vector_cosine_ops"},
+)
@@ -0,0 +1,134 @@
+# app/multipart_stream.py
+from __future__ import annotations
+
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+
+try:  # python-multipart >= 0.0.13 renamed its import package
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # pragma: no cover - older python-multipart
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+MAX_FIELD_BYTES = 64 * 1024  # plain (non-file) form fields are tiny; cap them anyway
+
+
+class MultipartFileStream:
+    """
+    Incrementally parse a multipart/form-data request body and expose ONE file field
+    as an async byte stream, without spooling it to disk the way `UploadFile` does.
+
+    Usage:
+        form = MultipartFileStream(request, field="file")
+        await form.open()                 # reads until the file part's headers arrive
+        async for chunk in form.chunks():  # file bytes, in request-body-sized pieces
+            ...
+        form.fields["user_id"]            # plain fields; complete once chunks() is exhausted
+
+    :raises ValueError: not multipart, no boundary, or no `field` file part in the body
+    """
+
+    def __init__(self, request: Request, field: str = "file"):
+        _, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise ValueError("Expected a multipart/form-data body with a boundary")
+
+        self.field = field
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+
+        self._body = request.stream().__aiter__()
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._part_name = ""
+        self._in_file = False
+        self._file_done = False
+        self._value = bytearray()
+        self._chunks: List[bytes] = []
+
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+            },
+        )
+
+    # ---- parser callbacks ----
+    def _on_part_begin(self) -> None:
+        self._headers = []
+        self._value = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers.append((self._header_field.lower(), self._header_value))
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        self._part_name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = options.get(b"filename")
+        if self._part_name == self.field and filename is not None and self.filename is None:
+            self.filename = filename.decode("utf-8", errors="replace")
+            self.content_type = headers.get(b"content-type", b"").decode("latin-1") or None
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._chunks.append(bytes(data[start:end]))
+        elif len(self._value) < MAX_FIELD_BYTES:
+            self._value += data[start:end]
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
+        elif self._part_name:
+            self.fields[self._part_name] = self._value.decode("utf-8", errors="replace")
+
+    # ---- driving the parser ----
+    async def _feed(self) -> bool:
+        """Push the next body chunk through the parser; False once the body is exhausted."""
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            self._parser.finalize()
+            return False
+        if chunk:
+            self._parser.write(chunk)
+        return True
+
+    async def open(self) -> None:
+        while self.filename is None:
+            if not await self._feed():
+                raise ValueError(f"Missing file field '{self.field}'")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            if self._chunks:
+                data = b"".join(self._chunks)
+                self._chunks.clear()
+                yield data
+            if self._file_done:
+                # keep parsing so fields sent after the file still land in .fields
+                while await self._feed():
+                    pass
+                return
+            if not await self._feed():
+                return
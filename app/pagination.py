@@ -0,0 +1,37 @@
+# app/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+
+# Opaque keyset cursors: a urlsafe-base64 JSON list of the sort-key values of the
+# last row on the page. Clients must treat them as opaque strings.
+def encode_cursor(*values: Any) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Return the `size` values packed into `cursor`; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
+
+
+def parse_dt(value: Optional[str]) -> Optional[datetime]:
+    """Datetime cursor values round-trip as ISO strings (None stays None)."""
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Malformed cursor") from e
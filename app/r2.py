@@ -1,20 +1,42 @@
 # app/r2.py
 from __future__ import annotations
 
+import asyncio
 import os
+import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import BinaryIO, Optional
+from hashlib import sha256
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import BotoCoreError, ClientError
 
+from app.concurrency import run_blocking
+
 
 class R2ConfigError(RuntimeError):
     pass
 
 
+class UploadTooLargeError(ValueError):
+    """Raised by stream_upload when the incoming stream exceeds max_bytes."""
+
+
+class R2ChecksumError(IOError):
+    """Downloaded bytes don't match the expected SHA-256."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
 @lru_cache(maxsize=1)
 def _endpoint_url() -> str:
     account_id = os.getenv("R2_ACCOUNT_ID")
@@ -46,7 +68,21 @@ def s3_client():
         aws_access_key_id=access_key,
         aws_secret_access_key=secret_key,
         region_name="auto",
-        config=Config(signature_version="s3v4", retries={"max_attempts": 5}),
+        config=Config(
+            signature_version="s3v4",
+            retries={"max_attempts": 5},
+            # one pooled connection per concurrent ranged GET/part upload (default is 10)
+            max_pool_connections=_env_int("R2_MAX_POOL_CONNECTIONS", 32),
+        ),
+    )
+
+
+def _transfer_config() -> TransferConfig:
+    """Managed uploads (upload_fileobj): R2_UPLOAD_PART_BYTES (16 MiB) / R2_UPLOAD_CONCURRENCY (8)."""
+    return TransferConfig(
+        multipart_threshold=16 * 1024 * 1024,
+        multipart_chunksize=max(_env_int("R2_UPLOAD_PART_BYTES", 16 * 1024 * 1024), MIN_PART_BYTES),
+        max_concurrency=max(_env_int("R2_UPLOAD_CONCURRENCY", 8), 1),
     )
 
 
@@ -71,7 +107,205 @@ def upload_fileobj(
     if cache_control:
         extra_args["CacheControl"] = cache_control
 
-    s3_client().upload_fileobj(fileobj, bucket_name(), key, ExtraArgs=extra_args)
+    s3_client().upload_fileobj(
+        fileobj, bucket_name(), key, ExtraArgs=extra_args, Config=_transfer_config()
+    )
+
+
+# ---- Multipart uploads (direct-to-R2 from the client) ----
+def create_multipart_upload(key: str, content_type: Optional[str] = None) -> str:
+    """Start a multipart upload for `key` and return its UploadId."""
+    extra_args = {}
+    if content_type:
+        extra_args["ContentType"] = content_type
+    resp = s3_client().create_multipart_upload(Bucket=bucket_name(), Key=key, **extra_args)
+    return resp["UploadId"]
+
+
+def presign_upload_part(key: str, upload_id: str, part_number: int, expires_in: int = 3600) -> str:
+    """
+    Return a presigned PUT URL for one part of a multipart upload.
+    The client PUTs the raw bytes and keeps the returned ETag header for completion
+    (the bucket CORS policy must expose `ETag` for browser uploads).
+    """
+    return s3_client().generate_presigned_url(
+        "upload_part",
+        Params={
+            "Bucket": bucket_name(),
+            "Key": key,
+            "UploadId": upload_id,
+            "PartNumber": part_number,
+        },
+        ExpiresIn=expires_in,
+    )
+
+
+def complete_multipart_upload(key: str, upload_id: str, parts: List[Dict]) -> Dict:
+    """
+    Finalize a multipart upload.
+
+    :param parts: [{"PartNumber": 1, "ETag": "..."}, ...]; sorted here since S3 requires ascending order
+    :raises: BotoCoreError/ClientError on failure (e.g. missing/invalid parts)
+    """
+    ordered = sorted(parts, key=lambda p: p["PartNumber"])
+    return s3_client().complete_multipart_upload(
+        Bucket=bucket_name(),
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": ordered},
+    )
+
+
+def abort_multipart_upload(key: str, upload_id: str) -> None:
+    """Abort a multipart upload so R2 drops the already-uploaded parts."""
+    try:
+        s3_client().abort_multipart_upload(Bucket=bucket_name(), Key=key, UploadId=upload_id)
+    except (BotoCoreError, ClientError):
+        # Same policy as delete_object: cleanup failures are non-fatal for MVP.
+        pass
+
+
+# ---- Streaming uploads (API process -> R2, single pass) ----
+MIN_PART_BYTES = 5 * 1024 * 1024  # S3/R2 minimum for every part but the last
+
+
+async def stream_upload(
+    chunks: AsyncIterator[bytes],
+    key: str,
+    content_type: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> Tuple[int, str]:
+    """
+    Stream an async byte iterator into R2 as a multipart upload, computing size and
+    SHA-256 in the same pass (no temp file).
+
+    Hashing and each part upload run on the bounded blocking pool (app.concurrency)
+    while the next part is read, so the event loop only shuffles buffers.
+    At most R2_STREAM_MAX_IN_FLIGHT parts are outstanding, so memory stays around
+    (in_flight + 1) * R2_STREAM_PART_BYTES. Bodies smaller than one part go up as a
+    single PutObject. The multipart upload is aborted on any failure.
+
+    :returns: (size_bytes, sha256_hex)
+    :raises UploadTooLargeError: stream exceeded max_bytes
+    :raises: BotoCoreError/ClientError on R2 failures
+    """
+    part_size = max(_env_int("R2_STREAM_PART_BYTES", 8 * 1024 * 1024), MIN_PART_BYTES)
+    max_in_flight = max(_env_int("R2_STREAM_MAX_IN_FLIGHT", 4), 1)
+
+    client = s3_client()
+    bucket = bucket_name()
+    hasher = sha256()
+    total = 0
+    buf = bytearray()
+    upload_id: Optional[str] = None
+    next_part = 1
+    parts: List[Dict] = []
+    pending: set = set()
+
+    def _upload_part(number: int, body: bytes) -> Dict:
+        resp = client.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+        )
+        return {"PartNumber": number, "ETag": resp["ETag"]}
+
+    async def _reap(return_when: str) -> None:
+        done, _ = await asyncio.wait(pending, return_when=return_when)
+        for task in done:
+            pending.discard(task)
+            parts.append(task.result())  # re-raises a failed part upload
+
+    async def _send(body: bytes) -> None:
+        nonlocal upload_id, next_part
+        if upload_id is None:
+            upload_id = await run_blocking(create_multipart_upload, key, content_type)
+        while len(pending) >= max_in_flight:
+            await _reap(asyncio.FIRST_COMPLETED)
+        pending.add(asyncio.create_task(run_blocking(_upload_part, next_part, body)))
+        next_part += 1
+
+    try:
+        async for chunk in chunks:
+            total += len(chunk)
+            if max_bytes is not None and total > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+            buf += chunk
+            while len(buf) >= part_size:
+                body = bytes(buf[:part_size])
+                del buf[:part_size]
+                # hash whole parts, in order, off the loop (hashlib releases the GIL)
+                await run_blocking(hasher.update, body)
+                await _send(body)
+
+        if buf:
+            await run_blocking(hasher.update, bytes(buf))
+
+        if upload_id is None:
+            extra_args = {"ContentType": content_type} if content_type else {}
+            await run_blocking(
+                client.put_object, Bucket=bucket, Key=key, Body=bytes(buf), **extra_args
+            )
+        else:
+            if buf:
+                await _send(bytes(buf))  # last part may be smaller than MIN_PART_BYTES
+            if pending:
+                await _reap(asyncio.ALL_COMPLETED)
+            await run_blocking(complete_multipart_upload, key, upload_id, parts)
+    except BaseException:
+        # let in-flight part uploads settle before aborting, or R2 may keep orphaned parts
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if upload_id is not None:
+            await run_blocking(abort_multipart_upload, key, upload_id)
+        raise
+
+    return total, hasher.hexdigest()
+
+
+def head_object(key: str) -> Dict:
+    """Return object metadata (ContentLength, ETag, ContentType, ...)."""
+    return s3_client().head_object(Bucket=bucket_name(), Key=key)
+
+
+# ---- Streaming downloads ----
+def presigned_get_url(key: str, expires_in: int = 3600) -> str:
+    """Presigned GET URL, e.g. for ffmpeg/ffprobe to read an object over HTTP (with Range seeks)."""
+    return s3_client().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket_name(), "Key": key},
+        ExpiresIn=expires_in,
+    )
+
+
+def iter_object(key: str, range_bytes: int = 16 * 1024 * 1024, chunk_bytes: int = 1024 * 1024) -> Iterator[bytes]:
+    """
+    Yield the object's bytes in order via sequential ranged GETs.
+
+    Each range is its own request, so a dropped connection only retries the rest of
+    that range (up to 3 times) instead of restarting the whole object.
+    """
+    client = s3_client()
+    bucket = bucket_name()
+    size = int(client.head_object(Bucket=bucket, Key=key)["ContentLength"])
+    pos = 0
+    while pos < size:
+        end = min(pos + range_bytes, size) - 1
+        failures = 0
+        while pos <= end:
+            start = pos
+            try:
+                resp = client.get_object(Bucket=bucket, Key=key, Range=f"bytes={pos}-{end}")
+                for chunk in resp["Body"].iter_chunks(chunk_bytes):
+                    pos += len(chunk)
+                    yield chunk
+            except (BotoCoreError, ClientError):
+                failures += 1
+                if failures >= 3:
+                    raise
+                continue
+            if pos == start:  # empty body: don't spin forever
+                failures += 1
+                if failures >= 3:
+                    raise IOError(f"R2 returned no data for {key} at byte {pos}")
 
 
 def delete_object(key: str) -> None:
@@ -83,10 +317,79 @@ def delete_object(key: str) -> None:
         # Log later with Sentry; for now, swallow.
         pass
 
-def download_to_temp(key: str) -> str:
+def is_sha256(value: Optional[str]) -> bool:
+    """True for a real hex digest (legacy rows carry placeholders like 'legacy')."""
+    return bool(value) and re.fullmatch(r"[0-9a-fA-F]{64}", value) is not None
+
+
+def _file_sha256(path: str) -> str:
+    hasher = sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def download_to_path(key: str, path: str, expected_sha256: Optional[str] = None) -> int:
+    """
+    Download the object at `key` into `path` with concurrent byte-range GETs.
+
+    The file is preallocated (sparse) to the object size and each range is written at
+    its offset with pwrite, so ranges land in any order without a reassembly pass.
+    Concurrency/range size: R2_DOWNLOAD_CONCURRENCY (8) / R2_DOWNLOAD_PART_BYTES (16 MiB).
+    A range whose stream breaks is resumed from where it stopped (3 attempts).
+
+    :param expected_sha256: if given, verify the whole file end-to-end
+    :returns: size in bytes
+    :raises R2ChecksumError: digest mismatch (the partial/bad file is left for the caller)
+    """
+    client = s3_client()
+    bucket = bucket_name()
+    size = int(client.head_object(Bucket=bucket, Key=key)["ContentLength"])
+    part = max(_env_int("R2_DOWNLOAD_PART_BYTES", 16 * 1024 * 1024), 1024 * 1024)
+    concurrency = max(_env_int("R2_DOWNLOAD_CONCURRENCY", 8), 1)
+
+    with open(path, "wb") as f:
+        f.truncate(size)  # sparse preallocation
+
+    def _fetch(start: int) -> None:
+        end = min(start + part, size) - 1
+        pos = start
+        for attempt in range(3):
+            try:
+                resp = client.get_object(Bucket=bucket, Key=key, Range=f"bytes={pos}-{end}")
+                for chunk in resp["Body"].iter_chunks(1024 * 1024):
+                    os.pwrite(fd, chunk, pos)
+                    pos += len(chunk)
+            except (BotoCoreError, ClientError):
+                if attempt == 2:
+                    raise
+            if pos > end:
+                return
+        raise IOError(f"Short read for {key} bytes {start}-{end} (stopped at {pos})")
+
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        if size:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                # list() re-raises the first failed range
+                list(pool.map(_fetch, range(0, size, part)))
+    finally:
+        os.close(fd)
+
+    if expected_sha256:
+        actual = _file_sha256(path)
+        if actual != expected_sha256.lower():
+            raise R2ChecksumError(f"sha256 mismatch for {key}: expected {expected_sha256}, got {actual}")
+    return size
+
+
+def download_to_temp(key: str, expected_sha256: Optional[str] = None) -> str:
     """
     Download the R2 object at `key` to a local temp file and return the file path.
     Caller is responsible for os.remove(path) when done.
+    Uses parallel ranged GETs (see download_to_path); pass `expected_sha256`
+    (e.g. Recording.sha256 when is_sha256() holds) for an end-to-end check.
 
     Example:
         p = download_to_temp(rec.r2_key)
@@ -101,13 +404,12 @@ def download_to_temp(key: str) -> str:
     os.close(fd)
 
     try:
-        with open(path, "wb") as f:
-            s3_client().download_fileobj(bucket_name(), key, f)
-    except (BotoCoreError, ClientError) as e:
-        # clean up the empty temp file on failure
+        download_to_path(key, path, expected_sha256=expected_sha256)
+    except Exception:
+        # clean up the partial temp file on failure
         try:
             os.remove(path)
         except FileNotFoundError:
             pass
         raise
-    return path
\ No newline at end of file
+    return path
@@ -0,0 +1,55 @@
+# app/schemas.py
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.alias_generators import to_camel
+
+from app.models import PriorityEnum, RecordingStatusEnum, TaskStatusEnum
+
+
+class _CamelModel(BaseModel):
+    """Request bodies use camelCase on the wire, like our responses."""
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+
+SHA256_PATTERN = r"^[0-9a-fA-F]{64}$"
+
+
+# ===== Direct-to-R2 multipart uploads =====
+class UploadInitRequest(_CamelModel):
+    filename: str = Field(min_length=1, max_length=512)
+    content_type: Optional[str] = None
+    file_size: int = Field(gt=0)
+    sha256: Optional[str] = Field(default=None, pattern=SHA256_PATTERN)
+    user_id: int = 1  # temporary until auth lands
+    reuse_results: bool = True  # copy transcript/tasks from an identical earlier upload
+
+
+class UploadedPart(_CamelModel):
+    part_number: int = Field(ge=1, le=10_000)
+    etag: str = Field(min_length=1)
+
+
+class UploadCompleteRequest(_CamelModel):
+    parts: List[UploadedPart] = Field(min_length=1)
+    sha256: Optional[str] = Field(default=None, pattern=SHA256_PATTERN)
+    reuse_results: bool = True
+
+
+# ===== Batch processing =====
+class ProcessBatchRequest(_CamelModel):
+    """Exactly one of `ids` or `status`; `userId` narrows a status backfill to one user."""
+    ids: Optional[List[str]] = Field(default=None, min_length=1, max_length=5_000)
+    status: Optional[RecordingStatusEnum] = None
+    user_id: Optional[int] = None
+    limit: int = Field(default=1_000, ge=1, le=5_000)  # status mode: rows per call
+
+
+# ===== Tasks =====
+class TaskBulkUpdateRequest(_CamelModel):
+    """Applied to every id in one UPDATE; omitted fields are left unchanged."""
+    ids: List[int] = Field(min_length=1, max_length=1_000)
+    status: Optional[TaskStatusEnum] = None
+    priority: Optional[PriorityEnum] = None
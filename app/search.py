@@ -0,0 +1,274 @@
+# app/search.py
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import any_, exists, func, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Embedding, Recording, Task, TranscriptSegment
+from worker.embeddings import embed_texts, get_backend
+
+# Full-text search over the generated, GIN-indexed `search_tsv` columns of
+# transcript_segments and tasks. Recordings are found through their segments: a
+# segment's tsvector is small (stored inline, no detoasting, never near Postgres's
+# 1 MB tsvector limit), and a recording ranks by its best-matching segment.
+#
+# Latency stays flat as the archive grows because:
+#   - `user_id` narrows the matches before anything is ranked,
+#   - at most SEARCH_MAX_CANDIDATES matching rows (per kind) are ranked. A term
+#     matching more rows than that is ranked within the first candidates the GIN scan
+#     returns, and the response says so ("approximate": true); narrow the query
+#     (more words, a phrase, user_id) for an exact ranking,
+#   - snippets come from the few best-matching segments of the top hits, and
+#     ts_headline only runs on those.
+TS_CONFIG = "english"
+HEADLINE_OPTS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=12, MaxFragments=1"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _tsquery(q: str):
+    # websearch syntax: "quoted phrases", OR, -excluded; never raises on user input
+    return func.websearch_to_tsquery(TS_CONFIG, q)
+
+
+def _max_candidates() -> int:
+    return max(_env_int("SEARCH_MAX_CANDIDATES", 2000), 1)
+
+
+def _of_user(recording_id_col, user_id: int):
+    # `= ANY(ARRAY(subquery))`: the user's ids are fetched once and the GIN scan is
+    # AND-ed with one recording_id index scan, rather than a nested loop that repeats
+    # the GIN scan for every recording of the user
+    ids = select(Recording.id).where(Recording.user_id == user_id).scalar_subquery()
+    return recording_id_col == any_(func.array(ids))
+
+
+def _recording_hits(db: Session, tsq, user_id: Optional[int], limit: int) -> Tuple[List, bool]:
+    """Top recordings by best segment rank; second value: candidates were capped."""
+    cap = _max_candidates()
+    matches = select(TranscriptSegment.recording_id, TranscriptSegment.search_tsv).where(
+        TranscriptSegment.search_tsv.op("@@")(tsq)
+    )
+    if user_id is not None:
+        matches = matches.where(_of_user(TranscriptSegment.recording_id, user_id))
+    cand = matches.limit(cap + 1).cte("cand")  # one extra row tells us we hit the cap
+    rank = func.max(func.ts_rank_cd(cand.c.search_tsv, tsq))
+    matches_per = func.count()
+    top = (
+        select(
+            cand.c.recording_id,
+            rank.label("rank"),
+            matches_per.label("matches"),
+            func.sum(matches_per).over().label("candidates"),
+        )
+        .group_by(cand.c.recording_id)
+        .order_by(rank.desc(), matches_per.desc(), cand.c.recording_id)
+        .limit(limit)
+        .subquery()
+    )
+    # recordings joined for the returned page only
+    rows = db.execute(
+        select(top.c.recording_id, top.c.rank, top.c.candidates, Recording.filename, Recording.created_at)
+        .join(Recording, Recording.id == top.c.recording_id)
+        .order_by(top.c.rank.desc(), top.c.matches.desc(), top.c.recording_id)
+    ).all()
+    return rows, bool(rows) and rows[0].candidates > cap
+
+
+def _snippets(db: Session, tsq, recording_ids: List[str], per_recording: int) -> Dict[str, List[Dict]]:
+    if not recording_ids:
+        return {}
+    ranked = (
+        select(
+            TranscriptSegment.recording_id,
+            TranscriptSegment.start_ms,
+            TranscriptSegment.end_ms,
+            TranscriptSegment.text,
+            func.row_number().over(
+                partition_by=TranscriptSegment.recording_id,
+                order_by=(func.ts_rank_cd(TranscriptSegment.search_tsv, tsq).desc(), TranscriptSegment.idx),
+            ).label("n"),
+        )
+        .where(
+            TranscriptSegment.recording_id.in_(recording_ids),
+            TranscriptSegment.search_tsv.op("@@")(tsq),
+        )
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            ranked.c.recording_id, ranked.c.start_ms, ranked.c.end_ms,
+            func.ts_headline(TS_CONFIG, ranked.c.text, tsq, HEADLINE_OPTS).label("highlight"),
+        )
+        .where(ranked.c.n <= per_recording)
+        .order_by(ranked.c.recording_id, ranked.c.start_ms)
+    ).all()
+    out: Dict[str, List[Dict]] = {}
+    for r in rows:
+        out.setdefault(r.recording_id, []).append({
+            "startSec": r.start_ms / 1000,
+            "endSec": r.end_ms / 1000,
+            "highlight": r.highlight,
+        })
+    return out
+
+
+def _task_hits(db: Session, tsq, user_id: Optional[int], limit: int) -> Tuple[List, bool]:
+    cap = _max_candidates()
+    matches = select(
+        Task.id, Task.recording_id, Task.title, Task.status, Task.search_tsv
+    ).where(Task.search_tsv.op("@@")(tsq))
+    if user_id is not None:
+        matches = matches.where(_of_user(Task.recording_id, user_id))
+    cand = matches.limit(cap + 1).cte("cand")
+    rank = func.ts_rank_cd(cand.c.search_tsv, tsq)
+    top = (
+        select(
+            cand.c.id, cand.c.recording_id, cand.c.title, cand.c.status, rank.label("rank"),
+            func.count().over().label("candidates"),
+        )
+        .order_by(rank.desc(), cand.c.id)
+        .limit(limit)
+        .subquery()
+    )
+    # headline only for the returned page
+    rows = db.execute(
+        select(
+            top.c.id, top.c.recording_id, top.c.title, top.c.status, top.c.rank,
+            func.ts_headline(TS_CONFIG, top.c.title, tsq, HEADLINE_OPTS).label("highlight"),
+            top.c.candidates,
+        ).order_by(top.c.rank.desc(), top.c.id)
+    ).all()
+    return rows, bool(rows) and rows[0].candidates > cap
+
+
+def search(db: Session, q: str, user_id: Optional[int] = None, limit: int = 20) -> Dict:
+    tsq = _tsquery(q)
+    hits, hits_capped = _recording_hits(db, tsq, user_id, limit)
+    snippets = _snippets(
+        db, tsq, [h.recording_id for h in hits], _env_int("SEARCH_SNIPPETS_PER_HIT", 3)
+    )
+    tasks, tasks_capped = _task_hits(db, tsq, user_id, limit)
+    return {
+        "query": q,
+        # more matches than SEARCH_MAX_CANDIDATES: ranked within a bounded subset
+        "approximate": hits_capped or tasks_capped,
+        "recordings": [
+            {
+                "recordingId": h.recording_id,
+                "filename": h.filename,
+                "createdAt": h.created_at.isoformat(),
+                "rank": round(float(h.rank), 4),
+                "snippets": snippets.get(h.recording_id, []),
+            }
+            for h in hits
+        ],
+        "tasks": [
+            {
+                "id": t.id,
+                "recordingId": t.recording_id,
+                "title": t.title,
+                "status": t.status.value if t.status is not None else None,
+                "highlight": t.highlight,
+                "rank": round(float(t.rank), 4),
+            }
+            for t in tasks
+        ],
+    }
+
+
+# ---- Semantic ----
+# Nearest neighbours by cosine distance. The query is embedded in-process with the
+# same backend the worker used; vectors of other backends are filtered out by `model`.
+#
+# The HNSW index yields its ef_search nearest candidates and filters apply after that,
+# so a selective filter can starve a page. Hence:
+#   - user_id given: exact scan over that user's vectors (ix_embeddings_recording_id
+#     narrows them first), which is always complete and cheap at one user's scale,
+#   - otherwise HNSW, with pgvector >= 0.8's iterative scan (keeps walking the graph
+#     until the filtered page is full) when the server has it, else a wider ef_search.
+SEMANTIC_KINDS = ("segment", "task")
+
+_iterative_scan: Optional[bool] = None
+
+
+def _has_iterative_scan(db: Session) -> bool:
+    """hnsw.iterative_scan exists from pgvector 0.8.0 (checked once per process)."""
+    global _iterative_scan
+    if _iterative_scan is None:
+        version = db.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar()
+        try:
+            _iterative_scan = tuple(int(p) for p in (version or "0").split(".")[:2]) >= (0, 8)
+        except ValueError:
+            _iterative_scan = False
+    return _iterative_scan
+
+
+def semantic_search(
+    db: Session, q: str, user_id: Optional[int] = None, limit: int = 20, kind: Optional[str] = None
+) -> Dict:
+    backend = get_backend()
+    qvec = embed_texts([q], backend)[0]
+
+    cols = (
+        Embedding.recording_id, Embedding.kind, Embedding.ref_id,
+        Embedding.start_ms, Embedding.end_ms, Embedding.content,
+    )
+    filters = [
+        Embedding.model == backend.name,
+        # a task vector whose title was edited since is stale until embed_tasks runs
+        or_(
+            Embedding.task_id.is_(None),
+            exists().where(Task.id == Embedding.task_id, Task.title == Embedding.content),
+        ),
+    ]
+    if kind is not None:
+        filters.append(Embedding.kind == kind)
+
+    if user_id is not None:
+        # MATERIALIZED: the planner can't swap in the HNSW index for the outer ORDER BY
+        scoped = (
+            select(*cols, Embedding.embedding)
+            .join(Recording, Recording.id == Embedding.recording_id)
+            .where(Recording.user_id == user_id, *filters)
+            .cte("scoped")
+            .prefix_with("MATERIALIZED")
+        )
+        distance = scoped.c.embedding.cosine_distance(qvec).label("distance")
+        stmt = select(*(scoped.c[c.key] for c in cols), distance)
+    else:
+        if _has_iterative_scan(db):
+            db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+        # more candidates per index probe, so post-filtering (model/kind) still fills a page
+        ef = max(_env_int("SEMANTIC_EF_SEARCH", 100), limit * 4)
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef)}"))
+        distance = Embedding.embedding.cosine_distance(qvec).label("distance")
+        stmt = select(*cols, distance).where(*filters)
+    # relaxed_order may return neighbours slightly out of order: re-sort the page
+    rows = sorted(db.execute(stmt.order_by(distance).limit(limit)).all(), key=lambda r: r.distance)
+    return {
+        "query": q,
+        "model": backend.name,
+        "items": [
+            {
+                "recordingId": r.recording_id,
+                "kind": r.kind,
+                "taskId": r.ref_id if r.kind == "task" else None,
+                "startSec": r.start_ms / 1000 if r.start_ms is not None else None,
+                "endSec": r.end_ms / 1000 if r.end_ms is not None else None,
+                "text": r.content,
+                "score": round(1.0 - float(r.distance), 4),
+            }
+            for r in rows
+        ],
+    }
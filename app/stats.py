@@ -0,0 +1,126 @@
+# app/stats.py
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Recording, Task
+from worker.queue import redis
+
+# Dashboard counters. `count(*)` is a full scan on Postgres, so by default:
+#   - global totals come from planner estimates (pg_class.reltuples),
+#   - the global per-status split comes from column statistics (pg_stats MCVs),
+#   - per-user numbers are exact but index-backed (ix_recordings_user_created_id),
+# and every answer is cached in Redis for STATS_TTL_SEC. `exact=True` recomputes
+# with real counts and refreshes the cache.
+CACHE_PREFIX = "stats:v1"
+
+
+def _ttl() -> int:
+    try:
+        return max(int(os.getenv("STATS_TTL_SEC", "30")), 1)
+    except ValueError:
+        return 30
+
+
+def _cached(key: str, compute: Callable[[], Dict], refresh: bool = False) -> Dict:
+    """Read-through Redis cache; Redis outages degrade to computing every time."""
+    full_key = f"{CACHE_PREFIX}:{key}"
+    if not refresh:
+        try:
+            hit = redis.get(full_key)
+            if hit:
+                return json.loads(hit)
+        except Exception:
+            pass
+    value = compute()
+    value["computedAt"] = datetime.utcnow().isoformat()
+    try:
+        redis.set(full_key, json.dumps(value), ex=_ttl())
+    except Exception:
+        pass
+    return value
+
+
+# ---- Estimates ----
+def _estimated_rows(db: Session, table: str) -> Optional[int]:
+    """Planner row estimate; None if the table was never analyzed (reltuples = -1)."""
+    n = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+        {"t": table},
+    ).scalar()
+    return int(n) if n is not None and n >= 0 else None
+
+
+def _estimated_status_split(db: Session, total: int) -> Optional[Dict[str, int]]:
+    """Scale pg_stats most-common-value frequencies of recordings.status by the row estimate."""
+    row = db.execute(text("""
+        SELECT most_common_vals::text::text[] AS vals, most_common_freqs AS freqs
+        FROM pg_stats
+        WHERE tablename = 'recordings' AND attname = 'status'
+        LIMIT 1
+    """)).first()
+    if row is None or row.vals is None:
+        return None
+    return {v: round(f * total) for v, f in zip(row.vals, row.freqs)}
+
+
+# ---- Exact ----
+def _exact_count(db: Session, column) -> int:
+    return db.execute(select(func.count(column))).scalar() or 0
+
+
+def _exact_status_split(db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+    q = select(Recording.status, func.count(Recording.id)).group_by(Recording.status)
+    if user_id is not None:
+        q = q.where(Recording.user_id == user_id)
+    return {s.value: n for s, n in db.execute(q).all()}
+
+
+def global_stats(db: Session, exact: bool = False) -> Dict:
+    def compute() -> Dict:
+        recordings = tasks = by_status = None
+        if not exact:
+            recordings = _estimated_rows(db, "recordings")
+            tasks = _estimated_rows(db, "tasks")
+            if recordings is not None:
+                by_status = _estimated_status_split(db, recordings)
+        approximate = any(v is not None for v in (recordings, tasks, by_status))
+        if recordings is None:
+            recordings = _exact_count(db, Recording.id)
+        if tasks is None:
+            tasks = _exact_count(db, Task.id)
+        if by_status is None:
+            by_status = _exact_status_split(db)
+        return {
+            "recordings": recordings,
+            "tasks": tasks,
+            "byStatus": by_status,
+            "approximate": approximate,
+        }
+
+    return _cached("global", compute, refresh=exact)
+
+
+def user_stats(db: Session, user_id: int, exact: bool = False) -> Dict:
+    def compute() -> Dict:
+        by_status = _exact_status_split(db, user_id)
+        tasks = db.execute(
+            select(func.count(Task.id))
+            .join(Recording, Recording.id == Task.recording_id)
+            .where(Recording.user_id == user_id)
+        ).scalar() or 0
+        return {
+            "userId": user_id,
+            "recordings": sum(by_status.values()),
+            "tasks": tasks,
+            "byStatus": by_status,
+            "approximate": False,
+        }
+
+    return _cached(f"user:{user_id}", compute, refresh=exact)
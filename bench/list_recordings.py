@@ -0,0 +1,154 @@
+# bench/list_recordings.py
+"""
+Read-path benchmark: GET /recordings query strategies on a seeded dataset.
+
+Seeds N recordings (default 100k) for a dedicated bench user, then measures pages/s for:
+  orm-offset   full Recording entities + OFFSET (the old list_recordings)
+  proj-offset  column projection + OFFSET
+  proj-keyset  column projection + (created_at, id) cursor (current cursor mode)
+
+Each strategy walks --pages pages from the top, so OFFSET's deep-page cost shows up.
+Runs in-process against DATABASE_URL (no HTTP), using the same columns/serializer as the API.
+
+Usage:
+    python -m bench.list_recordings --rows 100000 --pages 200
+    python -m bench.list_recordings --cleanup      # drop the seeded rows
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, tuple_
+
+from app.db import SessionLocal
+from app.main import RECORDING_LIST_COLUMNS, _recording_list_item
+from app.models import Recording, RecordingStatusEnum, User
+
+BENCH_EMAIL = "bench@parrottasks.app"
+BENCH_PREFIX = "bench/"
+BATCH = 5_000
+
+
+def _bench_user(db) -> int:
+    user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    if not user:
+        user = User(email=BENCH_EMAIL, name="Bench User")
+        db.add(user)
+        db.commit()
+    return user.id
+
+
+def seed(db, user_id: int, rows: int) -> None:
+    have = db.execute(
+        select(func.count(Recording.id)).where(Recording.r2_key.like(f"{BENCH_PREFIX}%"))
+    ).scalar_one()
+    if have >= rows:
+        print(f"seed: {have} bench rows already present")
+        return
+    statuses = [RecordingStatusEnum.ready, RecordingStatusEnum.queued, RecordingStatusEnum.failed]
+    start = datetime.utcnow() - timedelta(days=365)
+    print(f"seed: inserting {rows - have} rows ...")
+    for base in range(have, rows, BATCH):
+        batch = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "filename": f"meeting-{i}.m4a",
+                "mime_type": "audio/mp4",
+                "file_size": random.randint(1_000_000, 500_000_000),
+                "sha256": os.urandom(32).hex(),
+                "r2_key": f"{BENCH_PREFIX}{uuid.uuid4()}",
+                "created_at": start + timedelta(seconds=i * 300),
+                "duration_sec": random.randint(60, 7200),
+                "status": random.choice(statuses),
+            }
+            for i in range(base, min(base + BATCH, rows))
+        ]
+        db.execute(insert(Recording), batch)
+        db.commit()
+
+
+def cleanup(db) -> None:
+    res = db.execute(delete(Recording).where(Recording.r2_key.like(f"{BENCH_PREFIX}%")))
+    db.commit()
+    print(f"cleanup: deleted {res.rowcount} rows")
+
+
+def run_orm_offset(db, user_id: int, pages: int, limit: int) -> None:
+    for page in range(pages):
+        rows = (
+            db.query(Recording)
+            .filter(Recording.user_id == user_id)
+            .order_by(Recording.created_at.desc())
+            .offset(page * limit)
+            .limit(limit)
+            .all()
+        )
+        [_recording_list_item(r) for r in rows]
+        db.expunge_all()
+
+
+def run_proj_offset(db, user_id: int, pages: int, limit: int) -> None:
+    for page in range(pages):
+        rows = db.execute(
+            select(*RECORDING_LIST_COLUMNS)
+            .where(Recording.user_id == user_id)
+            .order_by(Recording.created_at.desc())
+            .offset(page * limit)
+            .limit(limit)
+        ).all()
+        [_recording_list_item(r) for r in rows]
+
+
+def run_proj_keyset(db, user_id: int, pages: int, limit: int) -> None:
+    last = None
+    for _ in range(pages):
+        q = select(*RECORDING_LIST_COLUMNS).where(Recording.user_id == user_id)
+        if last is not None:
+            q = q.where(tuple_(Recording.created_at, Recording.id) < tuple_(*last))
+        rows = db.execute(
+            q.order_by(Recording.created_at.desc(), Recording.id.desc()).limit(limit)
+        ).all()
+        [_recording_list_item(r) for r in rows]
+        if not rows:
+            break
+        last = (rows[-1].created_at, rows[-1].id)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--pages", type=int, default=200, help="pages walked per strategy")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--cleanup", action="store_true")
+    args = ap.parse_args()
+
+    if SessionLocal is None:
+        raise SystemExit("DATABASE_URL not configured")
+
+    with SessionLocal() as db:
+        if args.cleanup:
+            cleanup(db)
+            return
+        user_id = _bench_user(db)
+        seed(db, user_id, args.rows)
+
+        for name, fn in (
+            ("orm-offset", run_orm_offset),
+            ("proj-offset", run_proj_offset),
+            ("proj-keyset", run_proj_keyset),
+        ):
+            fn(db, user_id, 5, args.limit)  # warm-up
+            t0 = time.perf_counter()
+            fn(db, user_id, args.pages, args.limit)
+            secs = time.perf_counter() - t0
+            print(f"{name:>12}: {args.pages / secs:8.1f} pages/s  ({secs * 1000 / args.pages:6.2f} ms/page)")
+
+
+if __name__ == "__main__":
+    main()
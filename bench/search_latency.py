@@ -0,0 +1,50 @@
+# bench/search_latency.py
+"""
+GET /search query latency against the current database (in-process, no HTTP).
+
+Runs each query --repeat times through app.search.search and prints p50/p95/max in
+ms, so regressions against the 50 ms budget show up before they reach the API.
+Pair with a large archive (e.g. one seeded by bench.list_recordings plus transcripts).
+
+Usage:
+    python -m bench.search_latency "budget" "action items" '"quarterly review"' --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.db import SessionLocal
+from app.search import search
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("queries", nargs="+")
+    ap.add_argument("--repeat", type=int, default=30)
+    ap.add_argument("--user-id", type=int, default=None)
+    ap.add_argument("--limit", type=int, default=20)
+    args = ap.parse_args()
+
+    if SessionLocal is None:
+        raise SystemExit("DATABASE_URL not configured")
+
+    with SessionLocal() as db:
+        for q in args.queries:
+            search(db, q, user_id=args.user_id, limit=args.limit)  # warm-up
+            times = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                res = search(db, q, user_id=args.user_id, limit=args.limit)
+                times.append((time.perf_counter() - t0) * 1000)
+            times.sort()
+            p95 = times[max(0, int(len(times) * 0.95) - 1)]
+            print(
+                f"{q!r:>24}: p50 {statistics.median(times):7.2f} ms  p95 {p95:7.2f} ms  "
+                f"max {times[-1]:7.2f} ms  ({len(res['recordings'])} recordings, {len(res['tasks'])} tasks)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# bench/upload_latency.py
+"""
+Load benchmark: GET /recordings latency while large uploads are in flight.
+
+Runs two phases against a live API (uvicorn with the real DB + R2 configured):
+  1) baseline  - only GET /recordings probes
+  2) loaded    - the same probes while N concurrent POST /recordings uploads stream
+
+and prints p50/p95/p99/max for each phase. With the upload path off the event loop,
+p99 in the loaded phase should stay close to baseline.
+
+Usage:
+    python -m bench.upload_latency --base-url http://localhost:8000 --uploads 4 --size-mb 512
+
+Stdlib only, so it runs anywhere the API does.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import statistics
+import threading
+import time
+import uuid
+from typing import Iterator, List
+from urllib.parse import urlparse
+
+CHUNK = 1024 * 1024
+
+
+def _conn(base_url: str) -> http.client.HTTPConnection:
+    u = urlparse(base_url)
+    cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+    return cls(u.hostname, u.port, timeout=600)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _report(label: str, samples: List[float]) -> None:
+    if not samples:
+        print(f"{label:>9}: no samples")
+        return
+    ms = [s * 1000 for s in samples]
+    print(
+        f"{label:>9}: n={len(ms):5d}  p50={statistics.median(ms):7.1f}ms  "
+        f"p95={_percentile(ms, 95):7.1f}ms  p99={_percentile(ms, 99):7.1f}ms  max={max(ms):7.1f}ms"
+    )
+
+
+def probe(base_url: str, seconds: float, interval: float) -> List[float]:
+    """Hit GET /recordings on one keep-alive connection; return latencies (s)."""
+    samples: List[float] = []
+    conn = _conn(base_url)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        t0 = time.perf_counter()
+        conn.request("GET", "/recordings?limit=20")
+        resp = conn.getresponse()
+        resp.read()
+        samples.append(time.perf_counter() - t0)
+        if resp.status != 200:
+            raise RuntimeError(f"GET /recordings -> {resp.status}")
+        time.sleep(interval)
+    conn.close()
+    return samples
+
+
+def upload(base_url: str, size_bytes: int, errors: List[str]) -> None:
+    """Stream a random multipart body of `size_bytes` to POST /recordings."""
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="user_id"\r\n\r\n1\r\n'
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="bench-{boundary[:8]}.mp3"\r\n'
+        "Content-Type: audio/mpeg\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    # random (incompressible, never deduplicated) payload, generated lazily
+    block = os.urandom(CHUNK)
+
+    def body() -> Iterator[bytes]:
+        yield head
+        sent = 0
+        while sent < size_bytes:
+            n = min(CHUNK, size_bytes - sent)
+            yield uuid.uuid4().bytes + block[16:n] if n > 16 else block[:n]
+            sent += n
+        yield tail
+
+    conn = _conn(base_url)
+    try:
+        conn.request(
+            "POST",
+            "/recordings",
+            body=body(),
+            headers={
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "Content-Length": str(len(head) + size_bytes + len(tail)),
+            },
+        )
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            errors.append(f"upload -> {resp.status}")
+    except Exception as e:  # keep probing even if an upload dies
+        errors.append(f"upload failed: {e}")
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base-url", default="http://localhost:8000")
+    ap.add_argument("--uploads", type=int, default=4, help="concurrent uploads in the loaded phase")
+    ap.add_argument("--size-mb", type=int, default=512, help="size of each upload")
+    ap.add_argument("--seconds", type=float, default=20.0, help="baseline phase duration")
+    ap.add_argument("--interval", type=float, default=0.05, help="pause between probes")
+    args = ap.parse_args()
+
+    print(f"baseline: probing GET /recordings for {args.seconds:.0f}s ...")
+    baseline = probe(args.base_url, args.seconds, args.interval)
+
+    print(f"loaded:   {args.uploads} x {args.size_mb} MB uploads + probes ...")
+    errors: List[str] = []
+    uploaders = [
+        threading.Thread(target=upload, args=(args.base_url, args.size_mb * CHUNK, errors))
+        for _ in range(args.uploads)
+    ]
+    started = time.monotonic()
+    for t in uploaders:
+        t.start()
+
+    loaded: List[float] = []
+    while any(t.is_alive() for t in uploaders):
+        loaded.extend(probe(args.base_url, 1.0, args.interval))
+    upload_secs = time.monotonic() - started
+
+    print()
+    _report("baseline", baseline)
+    _report("loaded", loaded)
+    print(f"uploads finished in {upload_secs:.1f}s ({len(errors)} errors)")
+    for e in errors:
+        print("  -", e)
+
+
+if __name__ == "__main__":
+    main()
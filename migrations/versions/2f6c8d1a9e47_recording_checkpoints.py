@@ -0,0 +1,42 @@
+"""recording checkpoints
+
+Revision ID: 2f6c8d1a9e47
+Revises: e7a14c9d2b58
+Create Date: 2026-10-17 16:02:31.584120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6c8d1a9e47'
+down_revision: Union[str, Sequence[str], None] = 'e7a14c9d2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recording_checkpoints',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('recording_id', sa.String(length=40), nullable=False),
+        sa.Column('stage', sa.String(length=32), nullable=False),
+        sa.Column('chunk_index', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('artifact_key', sa.String(length=512), nullable=True),
+        sa.Column('data', pg.JSONB(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=False), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['recording_id'], ['recordings.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('recording_id', 'stage', 'chunk_index'),
+    )
+    op.create_index('ix_recording_checkpoints_recording_id', 'recording_checkpoints', ['recording_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recording_checkpoints_recording_id', table_name='recording_checkpoints')
+    op.drop_table('recording_checkpoints')
@@ -0,0 +1,31 @@
+"""multipart upload fields
+
+Revision ID: 3b7e2d9a41c6
+Revises: 151031f7e1e0
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e2d9a41c6'
+down_revision: Union[str, Sequence[str], None] = '151031f7e1e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # new status for recordings whose bytes are still being PUT straight to R2
+    op.execute("ALTER TYPE recordingstatusenum ADD VALUE IF NOT EXISTS 'uploading';")
+    op.add_column('recordings', sa.Column('upload_id', sa.String(length=1024), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recordings', 'upload_id')
+    # NOTE: Postgres can't drop enum labels; 'uploading' stays on the type.
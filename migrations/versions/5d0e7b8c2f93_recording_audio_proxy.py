@@ -0,0 +1,28 @@
+"""recording audio proxy
+
+Revision ID: 5d0e7b8c2f93
+Revises: c52f9a3e6b10
+Create Date: 2026-10-17 14:41:22.907316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0e7b8c2f93'
+down_revision: Union[str, Sequence[str], None] = 'c52f9a3e6b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recordings', sa.Column('audio_r2_key', sa.String(length=512), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recordings', 'audio_r2_key')
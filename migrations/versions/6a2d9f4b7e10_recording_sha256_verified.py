@@ -0,0 +1,38 @@
+"""recording sha256_verified flag
+
+Revision ID: 6a2d9f4b7e10
+Revises: d1b7e4a92c35
+Create Date: 2026-10-17 19:42:05.318224
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a2d9f4b7e10'
+down_revision: Union[str, Sequence[str], None] = 'd1b7e4a92c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'recordings',
+        sa.Column('sha256_verified', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    # Rows uploaded through the API were hashed server-side; presigned uploads
+    # (upload_started_at set) carry a client-asserted hash and stay unverified
+    # until the post-upload check runs.
+    op.execute(
+        "UPDATE recordings SET sha256_verified = true "
+        "WHERE upload_started_at IS NULL AND sha256 ~ '^[0-9a-f]{64}$'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recordings', 'sha256_verified')
@@ -0,0 +1,40 @@
+"""embeddings.task_id foreign key
+
+Revision ID: 7c3e1b5d8a24
+Revises: 6a2d9f4b7e10
+Create Date: 2026-10-17 20:05:31.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e1b5d8a24'
+down_revision: Union[str, Sequence[str], None] = '6a2d9f4b7e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('embeddings', sa.Column('task_id', sa.Integer(), nullable=True))
+    # Task vectors of already-deleted tasks have nothing left to point at
+    op.execute(
+        "DELETE FROM embeddings e WHERE e.kind = 'task' "
+        "AND NOT EXISTS (SELECT 1 FROM tasks t WHERE t.id = e.ref_id)"
+    )
+    op.execute("UPDATE embeddings SET task_id = ref_id WHERE kind = 'task'")
+    op.create_foreign_key(
+        'embeddings_task_id_fkey', 'embeddings', 'tasks', ['task_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index('ix_embeddings_task_id', 'embeddings', ['task_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_task_id', table_name='embeddings')
+    op.drop_constraint('embeddings_task_id_fkey', 'embeddings', type_='foreignkey')
+    op.drop_column('embeddings', 'task_id')
@@ -0,0 +1,38 @@
+"""drop transcripts.search_tsv
+
+Revision ID: 8d4f2a6c1e37
+Revises: 7c3e1b5d8a24
+Create Date: 2026-10-17 21:12:44.519803
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2a6c1e37'
+down_revision: Union[str, Sequence[str], None] = '7c3e1b5d8a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Search goes through transcript_segments.search_tsv; the whole-transcript vector
+    # duplicated it and could exceed the 1 MB tsvector limit on multi-hour transcripts
+    op.drop_index('ix_transcripts_search_tsv', table_name='transcripts')
+    op.drop_column('transcripts', 'search_tsv')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('transcripts', sa.Column(
+        'search_tsv', pg.TSVECTOR(),
+        sa.Computed("to_tsvector('english'::regconfig, coalesce(text, ''))", persisted=True),
+    ))
+    op.create_index(
+        'ix_transcripts_search_tsv', 'transcripts', ['search_tsv'], postgresql_using='gin',
+    )
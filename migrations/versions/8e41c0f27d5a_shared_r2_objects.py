@@ -0,0 +1,32 @@
+"""shared r2 objects (sha256 dedup)
+
+Revision ID: 8e41c0f27d5a
+Revises: 3b7e2d9a41c6
+Create Date: 2026-10-17 10:03:47.118530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41c0f27d5a'
+down_revision: Union[str, Sequence[str], None] = '3b7e2d9a41c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Recordings with identical bytes now point at one object, so r2_key can repeat
+    op.drop_constraint('uq_recordings_r2_key', 'recordings', type_='unique')
+    op.create_index('ix_recordings_r2_key', 'recordings', ['r2_key'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # NOTE: fails if deduplicated rows exist; repoint them before downgrading
+    op.drop_index('ix_recordings_r2_key', table_name='recordings')
+    op.create_unique_constraint('uq_recordings_r2_key', 'recordings', ['r2_key'])
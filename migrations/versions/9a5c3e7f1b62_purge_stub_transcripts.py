@@ -0,0 +1,39 @@
+"""purge stub engine output
+
+Revision ID: 9a5c3e7f1b62
+Revises: 8d4f2a6c1e37
+Create Date: 2026-10-17 23:05:18.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a5c3e7f1b62'
+down_revision: Union[str, Sequence[str], None] = '8d4f2a6c1e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STUB = "(SELECT recording_id FROM transcripts WHERE model = 'stub')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The stub engine used to store "(transcription pending)" as a real segment and
+    # transcript, which search, embeddings and summaries then picked up. It now stores
+    # nothing; bring earlier stub runs in line (a real engine re-transcribes them on
+    # the next /process).
+    op.execute(f"DELETE FROM embeddings WHERE kind = 'segment' AND recording_id IN {STUB}")
+    op.execute(f"DELETE FROM transcript_segments WHERE recording_id IN {STUB}")
+    op.execute(
+        "UPDATE transcripts SET text = '', segments = '[]'::jsonb, "
+        "summary = NULL, decisions = NULL, questions = NULL WHERE model = 'stub'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # placeholder text is not restored
+    pass
@@ -0,0 +1,55 @@
+"""transcript segments
+
+Revision ID: a83d5f0c6e21
+Revises: 2f6c8d1a9e47
+Create Date: 2026-10-17 16:47:09.330561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83d5f0c6e21'
+down_revision: Union[str, Sequence[str], None] = '2f6c8d1a9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'transcript_segments',
+        sa.Column('recording_id', sa.String(length=40), nullable=False),
+        sa.Column('idx', sa.Integer(), nullable=False),
+        sa.Column('start_ms', sa.Integer(), nullable=False),
+        sa.Column('end_ms', sa.Integer(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['recording_id'], ['recordings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('recording_id', 'idx'),
+    )
+    op.create_index(
+        'ix_transcript_segments_recording_start', 'transcript_segments',
+        ['recording_id', 'start_ms'],
+    )
+
+    # Backfill from finished transcripts' JSONB segments
+    op.execute(sa.text("""
+        INSERT INTO transcript_segments (recording_id, idx, start_ms, end_ms, text)
+        SELECT t.recording_id,
+               (s.ord - 1)::int,
+               round((s.seg->>'start')::numeric * 1000)::int,
+               round((s.seg->>'end')::numeric * 1000)::int,
+               coalesce(s.seg->>'text', '')
+        FROM transcripts t
+        CROSS JOIN LATERAL jsonb_array_elements(t.segments) WITH ORDINALITY AS s(seg, ord)
+        WHERE jsonb_typeof(t.segments) = 'array'
+    """))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transcript_segments_recording_start', table_name='transcript_segments')
+    op.drop_table('transcript_segments')
@@ -0,0 +1,47 @@
+"""full-text search columns
+
+Revision ID: b4e92f17c3d0
+Revises: a83d5f0c6e21
+Create Date: 2026-10-17 17:35:52.661408
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e92f17c3d0'
+down_revision: Union[str, Sequence[str], None] = 'a83d5f0c6e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column the tsvector is generated from)
+SEARCHABLE = (
+    ('transcripts', 'text'),
+    ('transcript_segments', 'text'),
+    ('tasks', 'title'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED generated columns: Postgres keeps them in sync on every insert/update,
+    # and queries never re-parse the documents (only ts_headline does, on few rows)
+    for table, source in SEARCHABLE:
+        op.add_column(table, sa.Column(
+            'search_tsv', pg.TSVECTOR(),
+            sa.Computed(f"to_tsvector('english'::regconfig, coalesce({source}, ''))", persisted=True),
+        ))
+        op.create_index(
+            f'ix_{table}_search_tsv', table, ['search_tsv'], postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in reversed(SEARCHABLE):
+        op.drop_index(f'ix_{table}_search_tsv', table_name=table)
+        op.drop_column(table, 'search_tsv')
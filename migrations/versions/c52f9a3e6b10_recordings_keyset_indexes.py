@@ -0,0 +1,37 @@
+"""recordings keyset pagination indexes
+
+Revision ID: c52f9a3e6b10
+Revises: 8e41c0f27d5a
+Create Date: 2026-10-17 11:26:09.553871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52f9a3e6b10'
+down_revision: Union[str, Sequence[str], None] = '8e41c0f27d5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Match ORDER BY created_at DESC, id DESC exactly so keyset pages are index range scans
+    op.create_index(
+        'ix_recordings_user_created_id', 'recordings',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_recordings_created_id', 'recordings',
+        [sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recordings_created_id', table_name='recordings')
+    op.drop_index('ix_recordings_user_created_id', table_name='recordings')
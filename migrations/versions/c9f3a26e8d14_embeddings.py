@@ -0,0 +1,54 @@
+"""embeddings for semantic search
+
+Revision ID: c9f3a26e8d14
+Revises: b4e92f17c3d0
+Create Date: 2026-10-17 18:20:14.048392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f3a26e8d14'
+down_revision: Union[str, Sequence[str], None] = 'b4e92f17c3d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBED_DIM = 384
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table(
+        'embeddings',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('recording_id', sa.String(length=40), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=False),
+        sa.Column('start_ms', sa.Integer(), nullable=True),
+        sa.Column('end_ms', sa.Integer(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('model', sa.String(length=128), nullable=False),
+        sa.Column('embedding', Vector(EMBED_DIM), nullable=False),
+        sa.ForeignKeyConstraint(['recording_id'], ['recordings.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('recording_id', 'kind', 'ref_id', 'model'),
+    )
+    op.create_index('ix_embeddings_recording_id', 'embeddings', ['recording_id'])
+    op.create_index(
+        'ix_embeddings_embedding_hnsw', 'embeddings', ['embedding'],
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_embedding_hnsw', table_name='embeddings')
+    op.drop_index('ix_embeddings_recording_id', table_name='embeddings')
+    op.drop_table('embeddings')
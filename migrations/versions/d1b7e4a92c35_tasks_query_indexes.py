@@ -0,0 +1,37 @@
+"""tasks query indexes
+
+Revision ID: d1b7e4a92c35
+Revises: c9f3a26e8d14
+Create Date: 2026-10-17 18:58:40.771523
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1b7e4a92c35'
+down_revision: Union[str, Sequence[str], None] = 'c9f3a26e8d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Equality filters first, then the keyset sort (due_date ASC NULLS LAST, id)
+    op.create_index(
+        'ix_tasks_assignee_status_due_id', 'tasks',
+        ['assignee', 'status', 'due_date', 'id'],
+    )
+    op.create_index(
+        'ix_tasks_status_due_id', 'tasks',
+        ['status', 'due_date', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_status_due_id', table_name='tasks')
+    op.drop_index('ix_tasks_assignee_status_due_id', table_name='tasks')
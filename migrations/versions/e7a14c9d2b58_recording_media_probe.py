@@ -0,0 +1,32 @@
+"""recording media probe fields
+
+Revision ID: e7a14c9d2b58
+Revises: 5d0e7b8c2f93
+Create Date: 2026-10-17 15:08:47.216093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a14c9d2b58'
+down_revision: Union[str, Sequence[str], None] = '5d0e7b8c2f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recordings', sa.Column('audio_codec', sa.String(length=64), nullable=True))
+    op.add_column('recordings', sa.Column('sample_rate', sa.Integer(), nullable=True))
+    op.add_column('recordings', sa.Column('channels', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recordings', 'channels')
+    op.drop_column('recordings', 'sample_rate')
+    op.drop_column('recordings', 'audio_codec')
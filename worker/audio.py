@@ -0,0 +1,271 @@
+# backend/worker/audio.py
+"""
+ffmpeg decoding as a stream: media bytes in, mono 16 kHz s16le PCM blocks out.
+
+Unless the worker media cache is on (recording_pcm), nothing touches local disk.
+For containers that decode front-to-back (mp3, aac/adts, wav, ogg) the R2 object is
+fed to ffmpeg's stdin from sequential ranged GETs. MP4/M4A may keep their index (moov
+atom) at the END of the file, which a pipe can't seek to, so those are read by ffmpeg
+itself from a presigned URL; its HTTP reader issues Range requests and still streams.
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import wave
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from app.r2 import (
+    delete_object,
+    download_to_path,
+    is_sha256,
+    iter_object,
+    presigned_get_url,
+    upload_fileobj,
+)
+from worker.media_cache import get_cache
+
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+FFPROBE_BIN = os.getenv("FFPROBE_BIN", "ffprobe")
+SAMPLE_RATE = 16_000
+BYTES_PER_SEC = SAMPLE_RATE * 2  # mono s16le
+
+# Audio proxy for video uploads: Opus in Ogg, mono 16 kHz, speech-tuned
+PROXY_MIME = "audio/ogg"
+PROXY_BITRATE = os.getenv("AUDIO_PROXY_BITRATE", "24k")
+
+# MIME types whose containers can be decoded from a non-seekable pipe
+PIPE_SAFE_MIME = {
+    PROXY_MIME,
+    "audio/mpeg",
+    "audio/aac",
+    "audio/x-aac",
+    "audio/wav",
+    "audio/x-wav",
+}
+
+
+def ffmpeg_pcm(
+    input_arg: str,
+    feed: Optional[Iterator[bytes]] = None,
+    block_bytes: int = BYTES_PER_SEC,
+) -> Iterator[bytes]:
+    """
+    Run ffmpeg on `input_arg` (path, URL, or "pipe:0" with `feed` supplying stdin)
+    and yield PCM as it is produced, ~block_bytes at a time.
+
+    :raises subprocess.CalledProcessError: ffmpeg failed (stderr attached)
+    """
+    cmd = [
+        FFMPEG_BIN, "-hide_banner", "-loglevel", "error",
+        "-i", input_arg,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-f", "s16le",
+        "pipe:1",
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if feed is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    feed_error: list = []
+    stderr_chunks: list = []
+
+    def _feed() -> None:
+        try:
+            for chunk in feed:
+                proc.stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its return code tells the story
+        except Exception as e:  # R2 read failure: surface it from the consumer side
+            feed_error.append(e)
+            proc.kill()
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    def _drain_stderr() -> None:
+        stderr_chunks.append(proc.stderr.read())
+
+    threads = [threading.Thread(target=_drain_stderr, daemon=True)]
+    if feed is not None:
+        threads.append(threading.Thread(target=_feed, daemon=True))
+    for t in threads:
+        t.start()
+
+    finished = False
+    try:
+        while True:
+            block = proc.stdout.read(block_bytes)
+            if not block:
+                break
+            yield block
+        finished = True
+    finally:
+        if not finished:
+            proc.kill()  # consumer stopped early (or raised)
+        proc.wait()
+        for t in threads:
+            t.join(timeout=5)
+
+    if feed_error:
+        raise feed_error[0]
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, stderr=b"".join(c or b"" for c in stderr_chunks)
+        )
+
+
+def r2_pcm(key: str, mime_type: Optional[str]) -> Iterator[bytes]:
+    """Decode the R2 object at `key` straight from the network (see module docstring)."""
+    if (mime_type or "").lower() in PIPE_SAFE_MIME:
+        return ffmpeg_pcm("pipe:0", feed=iter_object(key))
+    return ffmpeg_pcm(presigned_get_url(key))
+
+
+def upload_audio_proxy(src_key: str, dest_key: str) -> None:
+    """
+    Extract the first audio track of `src_key` as a compact Opus/Ogg object at `dest_key`.
+    ffmpeg reads the source over a presigned URL and its stdout is multipart-uploaded
+    as it is encoded, so neither the video nor the proxy is written to local disk.
+    """
+    cmd = [
+        FFMPEG_BIN, "-hide_banner", "-loglevel", "error",
+        "-i", presigned_get_url(src_key),
+        "-map", "0:a:0",
+        "-vn",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-c:a", "libopus",
+        "-b:a", PROXY_BITRATE,
+        "-application", "voip",
+        "-f", "ogg",
+        "pipe:1",
+    ]
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stderr_chunks: list = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    drain.start()
+    try:
+        upload_fileobj(proc.stdout, dest_key, content_type=PROXY_MIME)
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.wait()
+        drain.join(timeout=5)
+    if proc.returncode != 0:
+        delete_object(dest_key)  # don't leave a truncated proxy behind
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, stderr=b"".join(c or b"" for c in stderr_chunks)
+        )
+
+
+@dataclass
+class MediaInfo:
+    duration_sec: Optional[float] = None
+    codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+
+def _num(value, cast):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def probe_media(key: str, timeout: int = 30) -> MediaInfo:
+    """
+    Container/stream metadata of the R2 object at `key` without decoding it.
+
+    ffprobe reads the object over a presigned URL, so it only fetches what the
+    container needs: the header, plus a Range request to the tail for MP4s whose
+    moov atom comes last. Duration falls back from the container to the audio stream.
+
+    :raises subprocess.CalledProcessError: ffprobe failed (stderr attached)
+    """
+    cmd = [
+        FFPROBE_BIN, "-hide_banner", "-loglevel", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "format=duration:stream=codec_name,sample_rate,channels,duration",
+        "-of", "json",
+        presigned_get_url(key),
+    ]
+    out = subprocess.run(cmd, capture_output=True, timeout=timeout, check=True).stdout
+    data = json.loads(out or b"{}")
+    stream = (data.get("streams") or [{}])[0]
+    duration = _num((data.get("format") or {}).get("duration"), float)
+    if duration is None:
+        duration = _num(stream.get("duration"), float)
+    return MediaInfo(
+        duration_sec=duration,
+        codec=stream.get("codec_name"),
+        sample_rate=_num(stream.get("sample_rate"), int),
+        channels=_num(stream.get("channels"), int),
+    )
+
+
+def _iter_wav(path: str, block_bytes: int = BYTES_PER_SEC) -> Iterator[bytes]:
+    with wave.open(path, "rb") as w:
+        while True:
+            frames = w.readframes(block_bytes // 2)
+            if not frames:
+                return
+            yield frames
+
+
+def recording_pcm(
+    key: str, mime_type: Optional[str], sha: Optional[str], proxy: bool = False
+) -> Iterator[bytes]:
+    """
+    PCM for a recording, using the worker-local media cache when MEDIA_CACHE_DIR is set:
+
+      1. cached normalized WAV           -> no download, no transcode
+      2. cached source bytes             -> transcode locally, teeing PCM into the WAV entry
+      3. miss                            -> parallel ranged download into the cache, then 2.
+
+    `proxy=True` means `key` is the recording's audio proxy rather than the original:
+    it gets its own cache entries and isn't checked against the original's sha256.
+    Without a cache (or for legacy rows without a real sha256) this is r2_pcm().
+    """
+    cache = get_cache()
+    if cache is None or not is_sha256(sha):
+        yield from r2_pcm(key, mime_type)
+        return
+    sha = sha.lower()
+    src_kind, wav_kind = ("proxy", "proxy.wav") if proxy else ("media", "wav")
+
+    with cache.reading(sha, wav_kind) as wav:
+        if wav:
+            yield from _iter_wav(wav)
+            return
+
+    with cache.filling(sha, src_kind) as (path, fresh):
+        if fresh:
+            download_to_path(key, path, expected_sha256=None if proxy else sha)
+
+    with cache.reading(sha, src_kind) as media:
+        if media is None:  # evicted in between; rare enough to just stream
+            yield from r2_pcm(key, mime_type)
+            return
+        with cache.filling(sha, wav_kind) as (wav_path, fresh):
+            if not fresh:  # another worker transcoded it while we waited
+                yield from _iter_wav(wav_path)
+                return
+            with wave.open(wav_path, "wb") as out:
+                out.setnchannels(1)
+                out.setsampwidth(2)
+                out.setframerate(SAMPLE_RATE)
+                for block in ffmpeg_pcm(media):
+                    out.writeframes(block)
+                    yield block
@@ -0,0 +1,75 @@
+# backend/worker/checkpoints.py
+"""
+Resumable pipeline state in Postgres (recording_checkpoints + the Recording stage
+timestamps), so an RQ retry picks up where the failed attempt stopped:
+
+  audio proxy        Recording.audio_r2_key (R2 artifact, see jobs/proxy.py)
+  transcription      one "transcribe_chunk" row per decoded chunk, then
+                     Recording.transcribed_at once the transcript is stored
+  summary / tasks    Recording.summarized_at / Recording.tasks_extracted_at
+
+Chunk rows carry the chunking_key() and source object they were produced with and
+are ignored if either differs on the retry (different cuts, model or audio).
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import RecordingCheckpoint
+
+STAGE_TRANSCRIBE_CHUNK = "transcribe_chunk"
+
+
+def load_chunks(
+    db: Session, recording_id: str, key: str, source: str
+) -> Dict[int, Tuple[List[Dict], Optional[str]]]:
+    """{chunk_index: (segments, language)} saved by earlier attempts with the same plan."""
+    rows = db.execute(
+        select(RecordingCheckpoint.chunk_index, RecordingCheckpoint.artifact_key, RecordingCheckpoint.data)
+        .where(
+            RecordingCheckpoint.recording_id == recording_id,
+            RecordingCheckpoint.stage == STAGE_TRANSCRIBE_CHUNK,
+        )
+    ).all()
+    return {
+        r.chunk_index: (r.data["segments"], r.data.get("language"))
+        for r in rows
+        if r.artifact_key == source and (r.data or {}).get("key") == key
+    }
+
+
+def save_chunk(
+    db: Session,
+    recording_id: str,
+    index: int,
+    segments: List[Dict],
+    language: Optional[str],
+    key: str,
+    source: str,
+) -> None:
+    """Upsert one decoded chunk and commit right away: it must survive a crash."""
+    values = {
+        "recording_id": recording_id,
+        "stage": STAGE_TRANSCRIBE_CHUNK,
+        "chunk_index": index,
+        "artifact_key": source,
+        "data": {"key": key, "segments": segments, "language": language},
+    }
+    stmt = insert(RecordingCheckpoint).values(**values)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["recording_id", "stage", "chunk_index"],
+        set_={"artifact_key": stmt.excluded.artifact_key, "data": stmt.excluded.data},
+    ))
+    db.commit()
+
+
+def clear(db: Session, recording_id: str, stage: str) -> None:
+    """Drop a stage's partial state once its final result is stored (caller commits)."""
+    db.execute(delete(RecordingCheckpoint).where(
+        RecordingCheckpoint.recording_id == recording_id,
+        RecordingCheckpoint.stage == stage,
+    ))
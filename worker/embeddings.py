@@ -0,0 +1,156 @@
+# backend/worker/embeddings.py
+"""
+Pluggable text embeddings for semantic search (GET /search/semantic).
+
+Every backend returns L2-normalized float32 rows of EMBED_DIM (app.models) columns,
+so cosine distance in pgvector is a plain dot product. Texts are embedded in batches
+of EMBED_BATCH; the hashing backend is pure NumPy and vectorized per batch.
+
+Backends (EMBED_BACKEND):
+  hashing                signed feature hashing of word unigrams + bigrams; no model,
+                         deterministic, fast enough for archive backfills (default)
+  sentence-transformers  a small CPU model (EMBED_MODEL, default all-MiniLM-L6-v2);
+                         needs the optional `sentence-transformers` package
+"""
+from __future__ import annotations
+
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.models import EMBED_DIM
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (m / norms).astype(np.float32, copy=False)
+
+
+class EmbeddingBackend(ABC):
+    name = "base"
+    dim = EMBED_DIM
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32, rows L2-normalized."""
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Bag of unigrams + bigrams hashed (crc32: stable across processes, unlike hash())
+    into `dim` buckets with a sign bit, sublinear tf, then L2-normalized. All tokens of
+    a batch are scattered into the matrix with one np.add.at.
+    """
+
+    def __init__(self):
+        self.name = f"hashing:{self.dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: List[int] = []
+        hashes: List[int] = []
+        for i, text in enumerate(texts):
+            words = _TOKEN.findall((text or "").lower())
+            feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            hashes.extend(zlib.crc32(f.encode()) for f in feats)
+            rows.extend([i] * len(feats))
+        m = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if hashes:
+            h = np.fromiter(hashes, dtype=np.uint32, count=len(hashes))
+            signs = np.where(h & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(m, (np.asarray(rows), (h & 0x7FFFFFFF) % self.dim), signs)
+            m = np.sign(m) * np.log1p(np.abs(m))
+        return _normalize(m)
+
+
+class SentenceTransformersBackend(EmbeddingBackend):
+    def __init__(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ModuleNotFoundError as e:  # optional heavy dependency
+            raise RuntimeError(
+                "sentence-transformers is not installed (pip install sentence-transformers)"
+            ) from e
+
+        model = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+        self.name = f"st:{model}"
+        self._model = SentenceTransformer(model, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+        if self.dim != EMBED_DIM:
+            raise RuntimeError(f"{model} produces {self.dim}-d vectors, the embeddings table holds {EMBED_DIM}-d")
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        m = self._model.encode(
+            list(texts), batch_size=_env_int("EMBED_BATCH", 256), convert_to_numpy=True
+        )
+        return _normalize(np.asarray(m, dtype=np.float32))
+
+
+BACKENDS = {
+    "hashing": HashingBackend,
+    "sentence-transformers": SentenceTransformersBackend,
+}
+
+_backends: Dict[str, EmbeddingBackend] = {}
+
+
+def get_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    """Process-wide backend instance (models load once per worker/API process)."""
+    name = name or os.getenv("EMBED_BACKEND", "hashing")
+    if name not in _backends:
+        try:
+            _backends[name] = BACKENDS[name]()
+        except KeyError:
+            raise ValueError(f"Unknown EMBED_BACKEND '{name}' (expected one of {sorted(BACKENDS)})")
+    return _backends[name]
+
+
+def embed_texts(texts: Sequence[str], backend: Optional[EmbeddingBackend] = None) -> np.ndarray:
+    """Embed any number of texts, EMBED_BATCH at a time."""
+    backend = backend or get_backend()
+    batch = max(1, _env_int("EMBED_BATCH", 256))
+    if not texts:
+        return np.zeros((0, backend.dim), dtype=np.float32)
+    return np.vstack([backend.embed(texts[i:i + batch]) for i in range(0, len(texts), batch)])
+
+
+def segment_windows(segments: Sequence, window_sec: Optional[float] = None) -> List[Dict]:
+    """
+    Group consecutive transcript segments (rows with idx/start_ms/end_ms/text) into
+    ~window_sec passages: single segments are too short to embed meaningfully, and
+    windows keep the vector count per hour of audio small.
+    """
+    window_ms = int((window_sec or _env_int("EMBED_WINDOW_SEC", 30)) * 1000)
+    out: List[Dict] = []
+    cur: List = []
+    for seg in segments:
+        if cur and seg.end_ms - cur[0].start_ms > window_ms:
+            out.append(_window(cur))
+            cur = []
+        cur.append(seg)
+    if cur:
+        out.append(_window(cur))
+    return out
+
+
+def _window(segs: List) -> Dict:
+    return {
+        "ref_id": segs[0].idx,
+        "start_ms": segs[0].start_ms,
+        "end_ms": segs[-1].end_ms,
+        "content": " ".join(s.text.strip() for s in segs if s.text.strip()),
+    }
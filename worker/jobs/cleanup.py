@@ -1,3 +1,17 @@
+from sqlalchemy import func, or_
+from app.db import SessionLocal
+from app.models import Recording
+from app.r2 import delete_object
+
 def cleanup_media(r2_key: str):
-    # Hook for R2 deletion later—non-fatal for MVP
-    return {"deleted": False, "reason": "not_implemented"}
\ No newline at end of file
+    # Objects are shared by recordings with identical bytes (sha256 dedup),
+    # so only delete once no recording references the key anymore (as original or audio proxy).
+    db = SessionLocal()
+    try:
+        refs = db.query(func.count(Recording.id)).filter(or_(Recording.r2_key == r2_key, Recording.audio_r2_key == r2_key)).scalar() or 0
+    finally:
+        db.close()
+    if refs:
+        return {"deleted": False, "reason": "shared", "refs": refs}
+    delete_object(r2_key)
+    return {"deleted": True}
@@ -0,0 +1,136 @@
+import argparse
+from sqlalchemy import delete, exists, insert, select
+from app.db import SessionLocal
+from app.models import Embedding, Recording, RecordingStatusEnum, Task, TranscriptSegment
+from worker.embeddings import embed_texts, get_backend, segment_windows
+
+def _task_row(t):
+    return {
+        "recording_id": t.recording_id, "kind": "task", "ref_id": t.id, "task_id": t.id,
+        "start_ms": None, "end_ms": None, "content": t.title,
+    }
+
+def _insert_vectors(db, rows, backend):
+    vectors = embed_texts([r["content"] for r in rows], backend)
+    for r, v in zip(rows, vectors):
+        r["model"] = backend.name
+        r["embedding"] = v
+    db.execute(insert(Embedding), rows)
+
+def _embed_into(db, recording_ids):
+    """
+    (Re)build the embeddings of `recording_ids` for the current backend: gather every
+    passage and task title first, then one batched embed_texts() call and one bulk
+    INSERT for all of them. Caller commits.
+    """
+    backend = get_backend()
+    rows = []
+    segs = db.execute(
+        select(TranscriptSegment.recording_id, TranscriptSegment.idx, TranscriptSegment.start_ms,
+               TranscriptSegment.end_ms, TranscriptSegment.text)
+        .where(TranscriptSegment.recording_id.in_(recording_ids))
+        .order_by(TranscriptSegment.recording_id, TranscriptSegment.idx)
+    ).all()
+    by_rec = {}
+    for s in segs:
+        by_rec.setdefault(s.recording_id, []).append(s)
+    for rid, rec_segs in by_rec.items():
+        for w in segment_windows(rec_segs):
+            if w["content"]:
+                rows.append({"recording_id": rid, "kind": "segment", "task_id": None, **w})
+    for t in db.execute(
+        select(Task.id, Task.recording_id, Task.title).where(Task.recording_id.in_(recording_ids))
+    ):
+        rows.append(_task_row(t))
+
+    db.execute(delete(Embedding).where(
+        Embedding.recording_id.in_(recording_ids), Embedding.model == backend.name
+    ))
+    if not rows:
+        return 0
+    _insert_vectors(db, rows, backend)
+    return len(rows)
+
+def embed_recordings(recording_ids):
+    """Worker stage after summarization (tasks exist by then); safe to re-run."""
+    if isinstance(recording_ids, str):
+        recording_ids = [recording_ids]
+    db = SessionLocal()
+    try:
+        n = _embed_into(db, list(recording_ids))
+        db.commit()
+        return {"ok": True, "vectors": n}
+    finally:
+        db.close()
+
+def embed_tasks(task_ids):
+    """
+    Refresh the vectors of edited tasks; enqueue it from anything that changes a title.
+    Deleted tasks need nothing: their vectors go with them (embeddings.task_id FK).
+    """
+    backend = get_backend()
+    db = SessionLocal()
+    try:
+        tasks = db.execute(
+            select(Task.id, Task.recording_id, Task.title).where(Task.id.in_(list(task_ids)))
+        ).all()
+        db.execute(delete(Embedding).where(
+            Embedding.task_id.in_(list(task_ids)), Embedding.model == backend.name
+        ))
+        if tasks:
+            _insert_vectors(db, [_task_row(t) for t in tasks], backend)
+        db.commit()
+        return {"ok": True, "vectors": len(tasks)}
+    finally:
+        db.close()
+
+def stale_task_ids(db, backend_name: str, limit: int):
+    """Tasks whose stored vector no longer matches their title."""
+    return db.execute(
+        select(Embedding.task_id)
+        .join(Task, Task.id == Embedding.task_id)
+        .where(Embedding.model == backend_name, Embedding.content != Task.title)
+        .limit(limit)
+    ).scalars().all()
+
+def backfill(batch_recordings: int = 200, limit: int = 0):
+    """Embed every ready recording that has no vectors for the current backend yet."""
+    backend = get_backend()
+    done = 0
+    while True:
+        with SessionLocal() as db:
+            ids = db.execute(
+                select(Recording.id)
+                .where(
+                    Recording.status == RecordingStatusEnum.ready,
+                    ~exists().where(
+                        Embedding.recording_id == Recording.id, Embedding.model == backend.name
+                    ),
+                )
+                .order_by(Recording.created_at)
+                .limit(batch_recordings)
+            ).scalars().all()
+            if not ids:
+                break
+            n = _embed_into(db, ids)
+            db.commit()
+        done += len(ids)
+        print(f"[embed] {done} recordings (+{n} vectors)")
+        if limit and done >= limit:
+            break
+    # task titles edited without a re-embed
+    while True:
+        with SessionLocal() as db:
+            stale = stale_task_ids(db, backend.name, batch_recordings)
+        if not stale:
+            break
+        embed_tasks(stale)
+        print(f"[embed] re-embedded {len(stale)} edited tasks")
+    return done
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Backfill semantic-search embeddings")
+    ap.add_argument("--batch", type=int, default=200, help="recordings per transaction")
+    ap.add_argument("--limit", type=int, default=0, help="stop after N recordings (0 = all)")
+    args = ap.parse_args()
+    backfill(args.batch, args.limit)
@@ -0,0 +1,28 @@
+import math
+from app.db import SessionLocal
+from app.models import Recording
+from worker.audio import probe_media
+
+def apply_probe(rec: Recording) -> Recording:
+    """Fill duration/codec/sample rate/channels on `rec` from a header-only probe (caller commits)."""
+    info = probe_media(rec.r2_key)
+    if info.duration_sec is not None:
+        rec.duration_sec = int(math.ceil(info.duration_sec))
+    rec.audio_codec = info.codec
+    rec.sample_rate = info.sample_rate
+    rec.channels = info.channels
+    return rec
+
+def probe_recording(recording_id: str):
+    db = SessionLocal()
+    try:
+        rec = db.get(Recording, recording_id)
+        if not rec:
+            raise ValueError(f"Recording {recording_id} not found")
+        if rec.duration_sec is not None and rec.audio_codec:
+            return {"ok": True, "skipped": True}
+        apply_probe(rec)
+        db.commit()
+        return {"ok": True, "durationSec": rec.duration_sec, "codec": rec.audio_codec}
+    finally:
+        db.close()
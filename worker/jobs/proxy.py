@@ -0,0 +1,48 @@
+import hashlib
+from app.db import SessionLocal
+from app.models import Recording
+from app.r2 import head_object
+from botocore.exceptions import ClientError
+from worker.audio import upload_audio_proxy
+
+def _proxy_key(rec: Recording) -> str:
+    # Named after the source object, not the (possibly client-asserted) sha256: only
+    # recordings that really share that object (dedup) share its proxy.
+    return f"proxies/{hashlib.sha256(rec.r2_key.encode()).hexdigest()}.ogg"
+
+_MISSING_CODES = {"404", "NoSuchKey", "NotFound"}
+
+def _exists(key: str) -> bool:
+    try:
+        head_object(key)
+        return True
+    except ClientError as e:
+        # only a real "not found" means missing: a 403/5xx/throttle must fail the job (RQ
+        # retries it) instead of re-encoding and overwriting a proxy that may be there
+        if e.response.get("Error", {}).get("Code") in _MISSING_CODES:
+            return False
+        raise
+
+def extract_audio_proxy(recording_id: str):
+    """
+    Optional stage for video uploads: store an Opus audio-only proxy next to the original
+    so transcription downloads/decodes a fraction of the bytes. Failures leave the
+    recording untouched (the transcriber just falls back to the original).
+    """
+    db = SessionLocal()
+    try:
+        rec = db.get(Recording, recording_id)
+        if not rec:
+            raise ValueError(f"Recording {recording_id} not found")
+        if rec.audio_r2_key:
+            return {"ok": True, "key": rec.audio_r2_key, "skipped": True}
+
+        key = _proxy_key(rec)
+        if not _exists(key):
+            upload_audio_proxy(rec.r2_key, key)
+
+        rec.audio_r2_key = key
+        db.commit()
+        return {"ok": True, "key": key}
+    finally:
+        db.close()
@@ -1,35 +1,176 @@
 import datetime as dt
+import json
+import os
+import re
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import load_only
 from app.db import SessionLocal
-from app.models import Recording, Transcript, RecordingStatusEnum
+from app.models import Recording, Transcript, TranscriptSegment, Task, RecordingStatusEnum
+from worker import progress
+from worker.queue import q_default, retry_policy
+from worker.scheduler import enqueue_summaries
+from worker.summarization import batch_limits, get_engine, is_long, summarize_long
+from worker.jobs.embed import embed_recordings
+
+def _claim_batch(db, recording_id: str):
+    """
+    Lock this recording plus other transcribed-but-unsummarized ones of the same user
+    (oldest first) for one engine call: a prompt never mixes tenants' transcripts.
+    SKIP LOCKED: rows another summarize job already holds are left to it, including
+    our own (then that job's batch covers us and we return None).
+    """
+    max_items, max_chars = batch_limits()
+    pending = (
+        select(Recording)
+        .where(
+            Recording.status == RecordingStatusEnum.processing,
+            Recording.transcribed_at.isnot(None),
+            (Recording.summarized_at.is_(None)) | (Recording.tasks_extracted_at.is_(None)),
+        )
+        .with_for_update(skip_locked=True)
+    )
+    own = db.execute(
+        select(Recording).where(Recording.id == recording_id).with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if own is None:
+        return None
+    others = db.execute(
+        pending.where(Recording.id != recording_id, Recording.user_id == own.user_id)
+        .order_by(Recording.transcribed_at.asc())
+        .limit(max_items - 1)
+    ).scalars().all()
+
+    txs = {
+        tx.recording_id: tx
+        for tx in db.execute(
+            select(Transcript)
+            .options(load_only(Transcript.id, Transcript.recording_id, Transcript.text))
+            .where(Transcript.recording_id.in_([own.id] + [r.id for r in others]))
+        ).scalars()
+    }
+    # a long transcript is summarized on its own (map-reduce); others only join
+    # a batch of short ones and never push it past max_chars
+    batch, chars = [own], len(txs[own.id].text) if own.id in txs else 0
+    if own.id in txs and is_long(txs[own.id].text):
+        return batch, txs
+    for r in others:
+        n = len(txs[r.id].text) if r.id in txs else 0
+        if is_long(txs[r.id].text if r.id in txs else ""):
+            continue
+        if chars + n > max_chars:
+            break
+        batch.append(r)
+        chars += n
+    return batch, txs
+
+def _segment_texts(db, recording_id: str, text: str):
+    """Segment boundaries for chunking; sentence-ish pieces for legacy transcripts."""
+    rows = db.execute(
+        select(TranscriptSegment.text)
+        .where(TranscriptSegment.recording_id == recording_id)
+        .order_by(TranscriptSegment.idx)
+    ).scalars().all()
+    return rows or re.split(r"(?<=[.!?])\s+", text)
 
 def summarize_recording(recording_id: str):
     db = SessionLocal()
+    batch_ids = []
     try:
         rec = db.get(Recording, recording_id)
         if not rec:
             raise ValueError(f"Recording {recording_id} not found")
 
-        # Write a placeholder summary if empty
-        tx = db.query(Transcript).filter(Transcript.recording_id == recording_id).one_or_none()
-        if tx and (not tx.summary or not tx.summary.strip()):
-            tx.summary = "Summary pending (MVP stub)."
+        # Each stage commits its result together with its *_at mark, so a retry
+        # skips whatever an earlier attempt already finished
+        if rec.summarized_at is not None and rec.tasks_extracted_at is not None:
+            rec.status = RecordingStatusEnum.ready
             db.commit()
+            progress.publish(recording_id, "done", "ready", 100)
+            return {"ok": True, "skipped": True}
+        db.rollback()  # release the plain read before taking row locks
+
+        claimed = _claim_batch(db, recording_id)
+        if claimed is None:
+            db.rollback()
+            return {"ok": True, "batched": True}  # another job's batch has this recording
+        batch, txs = claimed
+        batch_ids = [r.id for r in batch]
+        # no transcript, or an empty one (stub engine): nothing to summarize
+        todo = [r for r in batch if r.id in txs and txs[r.id].text]
 
-        rec.summarized_at = dt.datetime.utcnow()
-        rec.tasks_extracted_at = dt.datetime.utcnow()
-        rec.status = RecordingStatusEnum.ready
+        # One engine call for the whole micro-batch, or map-reduce for one long transcript
+        if len(todo) == 1 and is_long(txs[todo[0].id].text):
+            progress.publish(recording_id, "summarizing", "processing", 10, mode="map-reduce")
+            results = [summarize_long(_segment_texts(db, todo[0].id, txs[todo[0].id].text))]
+        elif todo:
+            results = get_engine().summarize_batch([txs[r.id].text for r in todo])
+        else:
+            results = []
+
+        now = dt.datetime.utcnow()
+        summaries = [
+            {
+                "id": txs[r.id].id,
+                "summary": res.summary,
+                "decisions": json.dumps(res.decisions),
+                "questions": json.dumps(res.questions),
+            }
+            for r, res in zip(todo, results)
+            if r.summarized_at is None
+        ]
+        if summaries:
+            db.execute(update(Transcript), summaries)  # executemany UPDATE by primary key
+        task_rows = [
+            {
+                "recording_id": r.id,
+                "title": t["title"],
+                "assignee": t["assignee"],
+                "due_date": t["due_date"],
+                "priority": t["priority"],
+                "confidence": t["confidence"],
+            }
+            for r, res in zip(todo, results)
+            if r.tasks_extracted_at is None
+            for t in res.tasks
+        ]
+        if task_rows:
+            db.execute(insert(Task).values(task_rows))
+        for r in batch:
+            r.summarized_at = r.summarized_at or now
+            r.tasks_extracted_at = r.tasks_extracted_at or now
+            r.status = RecordingStatusEnum.ready
         db.commit()
-        return {"ok": True}
+
+        progress.publish_many(
+            progress.event(rid, "done", RecordingStatusEnum.ready.value, 100) for rid in batch_ids
+        )
+
+        # Semantic-search vectors for the whole batch, off the critical path
+        if os.getenv("EMBEDDINGS", "true").strip().lower() in ("1", "true", "yes", "on"):
+            try:
+                q_default.enqueue(embed_recordings, batch_ids, retry=retry_policy())
+            except Exception as e:
+                print(f"[summarize] ⚠️ could not enqueue embeddings for {batch_ids}: {e}")
+        return {"ok": True, "batch": batch_ids, "tasks": len(task_rows)}
     except Exception as e:
         try:
+            db.rollback()
             rec = db.get(Recording, recording_id)
             if rec:
-                rec.status = RecordingStatusEnum.failed
-                if hasattr(rec, "error_log"):
-                    rec.error_log = (str(e) or "")[:4000]
+                # an attempt RQ will retry leaves the recording in `processing`
+                if not progress.will_retry():
+                    rec.status = RecordingStatusEnum.failed
+                rec.error_log = (str(e) or "")[:4000]
                 db.commit()
+            # the rest of the batch is still pending; give each its own job again (theirs
+            # may already have returned "batched"). Deterministic ids: a retry of this job
+            # folds into those jobs instead of piling up duplicates.
+            others = [rid for rid in batch_ids if rid != recording_id]
+            if others:
+                enqueue_summaries(others, summarize_recording, retry=retry_policy())
         except Exception:
             pass
+        progress.publish_failure(recording_id, "summarizing", e)
         raise
     finally:
         db.close()
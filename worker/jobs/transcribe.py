@@ -1,41 +1,30 @@
 import datetime as dt
-import os
-import subprocess
-import tempfile
-from sqlalchemy import select
-from worker.queue import q_default, retry_policy
+from sqlalchemy import delete, insert, select
+from worker.queue import retry_policy
+from worker.scheduler import enqueue_summaries
 from app.db import SessionLocal
-from app.models import Recording, Transcript, RecordingStatusEnum
-from app.r2 import download_to_temp
+from app.models import Recording, Transcript, TranscriptSegment, RecordingStatusEnum
+from worker.audio import PROXY_MIME, recording_pcm
+from worker.transcription import chunking_key, transcribe_stream
+from worker import checkpoints, progress
+from worker.jobs.probe import apply_probe
 
 from worker.jobs.summarize import summarize_recording  # late import avoidance
 
-FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
-
-def _extract_wav(input_path: str) -> str:
-    """
-    Convert input media to mono 16kHz WAV for transcription.
-    Returns path to the WAV file. Caller must os.remove().
-    """
-    wav_fd, wav_path = tempfile.mkstemp(prefix="audio_", suffix=".wav")
-    os.close(wav_fd)
-    # ffmpeg -y -i input -ac 1 -ar 16000 -vn -f wav output.wav
-    cmd = [
-        FFMPEG_BIN, "-y",
-        "-i", input_path,
-        "-ac", "1",
-        "-ar", "16000",
-        "-vn",
-        "-f", "wav",
-        wav_path,
+def _segment_rows(recording_id: str, first_idx: int, segments):
+    return [
+        {
+            "recording_id": recording_id,
+            "idx": first_idx + i,
+            "start_ms": int(round(seg["start"] * 1000)),
+            "end_ms": int(round(seg["end"] * 1000)),
+            "text": seg["text"],
+        }
+        for i, seg in enumerate(segments)
     ]
-    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    return wav_path
 
 def transcribe_recording(recording_id: str):
     db = SessionLocal()
-    input_path = None
-    wav_path = None
     try:
         rec = db.get(Recording, recording_id)
         if not rec:
@@ -44,51 +33,110 @@ def transcribe_recording(recording_id: str):
         if not rec.r2_key:
             raise ValueError("Recording is missing r2_key")
 
+        # a duplicate (e.g. pre-dedup or older pipeline version) run finished first
+        if rec.status == RecordingStatusEnum.ready:
+            return {"ok": True, "skipped": True}
+
+        # transcript already stored by an earlier attempt: go straight to the next stage
+        if rec.transcribed_at is not None:
+            rec.status = RecordingStatusEnum.processing
+            db.commit()
+            enqueue_summaries([recording_id], summarize_recording, retry=retry_policy())
+            progress.publish(recording_id, "summarizing", "processing", 0)
+            return {"ok": True, "resumed": "summarize"}
+
         # mark as processing
         rec.status = RecordingStatusEnum.processing
         if getattr(rec, "upload_completed_at", None) is None:
             rec.upload_completed_at = dt.datetime.utcnow()
         db.commit()
+        progress.publish(recording_id, "transcribing", "processing", 0)
+
+        # 0) duration sizes the chunks; probe now if the post-upload probe hasn't run
+        if rec.duration_sec is None:
+            try:
+                apply_probe(rec)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"[transcribe] probe failed for {recording_id}: {e}")
+
+        # 1+2) R2 (or the worker's media cache) -> ffmpeg -> 16 kHz PCM, and
+        # 3) transcribe while it flows: silence-split chunks decoded in parallel
+        #    (video uploads: the small audio proxy when it's ready, else the original)
+        #    Chunks decoded by a failed attempt are checkpointed and not decoded again.
+        #    The media cache is keyed by sha256, so only a server-checked hash may use it.
+        sha = rec.sha256 if rec.sha256_verified else None
+        if rec.audio_r2_key:
+            source = rec.audio_r2_key
+            pcm = recording_pcm(source, PROXY_MIME, sha, proxy=True)
+        else:
+            source = rec.r2_key
+            pcm = recording_pcm(source, rec.mime_type, sha)
+        plan = chunking_key(rec.duration_sec)
+        done = checkpoints.load_chunks(db, recording_id, plan, source)
 
-        # 1) Download original media from R2
-        input_path = download_to_temp(rec.r2_key)
+        # Segments are readable (GET /recordings/{rid}/segments) as each chunk lands.
+        # Checkpoints always form a prefix of chunks, so the rows of a resumed run are
+        # exactly the first `kept` segments; anything after is from an abandoned plan.
+        seg_counts = {i: len(segs) for i, (segs, _) in done.items()}
+        kept = sum(seg_counts.values())
+        db.execute(delete(TranscriptSegment).where(
+            TranscriptSegment.recording_id == recording_id, TranscriptSegment.idx >= kept
+        ))
+        db.commit()
 
-        # 2) Extract normalized WAV for Whisper
-        wav_path = _extract_wav(input_path)
+        def _checkpoint(index, segments, language):
+            # one multi-row INSERT per chunk, committed with the chunk's checkpoint
+            first_idx = sum(seg_counts.get(i, 0) for i in range(index))
+            seg_counts[index] = len(segments)
+            if segments:
+                db.execute(insert(TranscriptSegment), _segment_rows(recording_id, first_idx, segments))
+            checkpoints.save_chunk(db, recording_id, index, segments, language, plan, source)
+            if segments and rec.duration_sec:
+                pct = 100.0 * segments[-1]["end"] / rec.duration_sec
+                progress.publish(recording_id, "transcribing", "processing", pct, chunk=index)
 
-        # 3) (Task 3) Run Whisper here; for now, write placeholder Transcript
+        result = transcribe_stream(
+            pcm, duration_sec=rec.duration_sec, on_segments=_checkpoint, done=done
+        )
         tx = db.execute(
             select(Transcript).where(Transcript.recording_id == recording_id)
         ).scalar_one_or_none()
         if tx is None:
-            tx = Transcript(recording_id=recording_id, text="(transcription pending)")
+            tx = Transcript(recording_id=recording_id, text="")
             db.add(tx)
-            db.commit()
-
-        # mark "transcribed"
+        tx.text = result.text
+        tx.segments = result.segments
+        tx.model = result.model
+        tx.language = result.language
+        if rec.duration_sec is None:
+            rec.duration_sec = int(round(result.duration_sec))
+        # transcript + "transcribed" mark commit together; chunk checkpoints are spent
         rec.transcribed_at = dt.datetime.utcnow()
+        checkpoints.clear(db, recording_id, checkpoints.STAGE_TRANSCRIBE_CHUNK)
         db.commit()
 
         # 4) Chain summarization
-        q_default.enqueue(summarize_recording, recording_id, retry=retry_policy())
-        return {"ok": True}
+        enqueue_summaries([recording_id], summarize_recording, retry=retry_policy())
+        progress.publish(recording_id, "summarizing", "processing", 0)
+        return {
+            "ok": True,
+            "firstSegmentSec": result.first_segment_sec,
+            "resumedChunks": len(done),
+        }
     except Exception as e:
         try:
+            db.rollback()
             rec = db.get(Recording, recording_id)
             if rec:
-                rec.status = RecordingStatusEnum.failed
-                if hasattr(rec, "error_log"):
-                    rec.error_log = (str(e) or "")[:4000]
+                if not progress.will_retry():
+                    rec.status = RecordingStatusEnum.failed
+                rec.error_log = (str(e) or "")[:4000]
                 db.commit()
         except Exception:
             pass
+        progress.publish_failure(recording_id, "transcribing", e)
         raise
     finally:
-        # cleanup temp files
-        for p in (wav_path, input_path):
-            if p and os.path.exists(p):
-                try:
-                    os.remove(p)
-                except Exception:
-                    pass
         db.close()
\ No newline at end of file
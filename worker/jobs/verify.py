@@ -0,0 +1,40 @@
+import hashlib
+from app.db import SessionLocal
+from app.models import Recording
+from app.r2 import iter_object
+
+def verify_sha256(recording_id: str):
+    """
+    Hash a presigned upload's stored bytes on the server. Its sha256 was asserted by the
+    client, so until this confirms it the row is never a cross-user dedup original (nor
+    a source of shared proxies or cache entries). On a mismatch the row takes the real digest.
+    """
+    db = SessionLocal()
+    try:
+        rec = db.get(Recording, recording_id)
+        if not rec:
+            raise ValueError(f"Recording {recording_id} not found")
+        if rec.sha256_verified:
+            return {"ok": True, "skipped": True}
+        key, claimed = rec.r2_key, (rec.sha256 or "").lower()
+        db.rollback()  # no open transaction while the whole object streams through
+
+        hasher = hashlib.sha256()
+        size = 0
+        for chunk in iter_object(key):
+            hasher.update(chunk)
+            size += len(chunk)
+        actual = hasher.hexdigest()
+
+        rec = db.get(Recording, recording_id)
+        if rec is None or rec.r2_key != key:
+            return {"ok": True, "skipped": True}  # deleted or repointed meanwhile
+        if actual != claimed:
+            print(f"[verify] ⚠️ sha256 mismatch for {recording_id}: claimed {claimed}, got {actual}")
+        rec.sha256 = actual
+        rec.file_size = size
+        rec.sha256_verified = True
+        db.commit()
+        return {"ok": True, "match": actual == claimed}
+    finally:
+        db.close()
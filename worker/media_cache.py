@@ -0,0 +1,185 @@
+# backend/worker/media_cache.py
+"""
+On-disk, per-host media cache shared by every RQ worker on the node.
+
+Entries are keyed by content (Recording.sha256) and kind ("media" = original bytes,
+"wav" = normalized 16 kHz mono WAV), so retries and re-processing of the same bytes
+skip both the R2 download and the ffmpeg transcode.
+
+  MEDIA_CACHE_DIR        cache root; unset/empty disables the cache
+  MEDIA_CACHE_MAX_BYTES  size cap (default 20 GB), enforced by LRU eviction
+
+Concurrency: every entry has a lock file under <root>/.locks. Readers hold a shared
+flock while using an entry, fillers hold an exclusive one (so two workers never
+download the same object twice), and eviction only removes entries it can lock
+exclusively without waiting, i.e. ones nobody is using. Files are published with an
+atomic rename, so a half-written entry is never visible.
+
+Lock files are unlinked with their entry (and orphans of entries that never got
+filled are swept), so .locks doesn't grow without bound. A locker therefore re-checks,
+once it holds the flock, that its file is still the one at the path, and retries if not.
+"""
+from __future__ import annotations
+
+import fcntl
+import os
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+LOCK_DIR = ".locks"
+
+
+class MediaCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, LOCK_DIR), exist_ok=True)
+
+    def path(self, sha: str, kind: str) -> str:
+        return os.path.join(self.root, sha[:2], f"{sha}.{kind}")
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self.root, LOCK_DIR, f"{name}.lock")
+
+    @contextmanager
+    def _flock(self, name: str, mode: int) -> Iterator[int]:
+        path = self._lock_path(name)
+        while True:
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, mode)
+            except BaseException:
+                os.close(fd)
+                raise
+            try:
+                current = os.stat(path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(fd).st_ino:
+                break
+            os.close(fd)  # unlinked by eviction while we waited: lock the new file
+        try:
+            yield fd
+        finally:
+            os.close(fd)  # releases the lock
+
+    def _unlink_lock(self, name: str) -> None:
+        """Remove a lock file; only while holding its exclusive flock."""
+        try:
+            os.remove(self._lock_path(name))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def reading(self, sha: str, kind: str) -> Iterator[Optional[str]]:
+        """Yield the entry's path (or None on a miss); eviction skips it until exit."""
+        final = self.path(sha, kind)
+        with self._flock(f"{sha}.{kind}", fcntl.LOCK_SH):
+            if not os.path.exists(final):
+                yield None
+                return
+            os.utime(final)  # LRU: mtime == last use
+            yield final
+
+    @contextmanager
+    def filling(self, sha: str, kind: str) -> Iterator[Tuple[str, bool]]:
+        """
+        Yield (path, fresh). If another worker already produced the entry (possibly
+        while we waited for the lock), fresh is False and path is the published file.
+        Otherwise write to `path` (a temp file); it's published atomically on a clean
+        exit and discarded on any exception.
+        """
+        final = self.path(sha, kind)
+        with self._flock(f"{sha}.{kind}", fcntl.LOCK_EX):
+            if os.path.exists(final):
+                os.utime(final)
+                yield final, False
+                return
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            tmp = f"{final}.tmp-{os.getpid()}"
+            try:
+                yield tmp, True
+                os.replace(tmp, final)
+            except BaseException:  # includes GeneratorExit from an abandoned stream
+                try:
+                    os.remove(tmp)
+                except FileNotFoundError:
+                    pass
+                raise
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str, str]]:
+        out = []
+        for sub in os.listdir(self.root):
+            if sub == LOCK_DIR:
+                continue
+            d = os.path.join(self.root, sub)
+            if not os.path.isdir(d):
+                continue
+            for name in os.listdir(d):
+                if ".tmp-" in name:
+                    continue
+                p = os.path.join(d, name)
+                try:
+                    st = os.stat(p)
+                except FileNotFoundError:
+                    continue
+                out.append((st.st_mtime, st.st_size, p, name))
+        return out
+
+    def _sweep_locks(self, names: set) -> None:
+        """Drop idle lock files whose entry doesn't exist (misses that were never filled)."""
+        for lock in os.listdir(os.path.join(self.root, LOCK_DIR)):
+            name = lock[: -len(".lock")]
+            if name == "evict" or name in names or not lock.endswith(".lock"):
+                continue
+            try:
+                with self._flock(name, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                    if not os.path.exists(self._entry_path(name)):
+                        self._unlink_lock(name)
+            except BlockingIOError:
+                continue
+
+    def _entry_path(self, name: str) -> str:
+        return os.path.join(self.root, name[:2], name)
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until under max_bytes; returns bytes freed."""
+        try:
+            with self._flock("evict", fcntl.LOCK_EX | fcntl.LOCK_NB):
+                entries = sorted(self._entries())
+                total = sum(e[1] for e in entries)
+                freed = 0
+                for _, size, p, name in entries:
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        with self._flock(name, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                            os.remove(p)
+                            self._unlink_lock(name)
+                    except (BlockingIOError, FileNotFoundError):
+                        continue  # in use right now (or already gone)
+                    total -= size
+                    freed += size
+                self._sweep_locks({e[3] for e in entries})
+                return freed
+        except BlockingIOError:
+            return 0  # another worker is already evicting
+
+
+_cache: Optional[MediaCache] = None
+
+
+def get_cache() -> Optional[MediaCache]:
+    """Process-wide cache from MEDIA_CACHE_DIR, or None when caching is disabled."""
+    global _cache
+    root = os.getenv("MEDIA_CACHE_DIR", "")
+    if not root:
+        return None
+    if _cache is None or _cache.root != root:
+        try:
+            max_bytes = int(os.getenv("MEDIA_CACHE_MAX_BYTES", str(20 * 1024 ** 3)))
+        except ValueError:
+            max_bytes = 20 * 1024 ** 3
+        _cache = MediaCache(root, max_bytes)
+    return _cache
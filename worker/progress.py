@@ -0,0 +1,81 @@
+# backend/worker/progress.py
+"""
+Processing progress over Redis pub/sub, fanned out to clients by
+GET /recordings/{rid}/events (app/events.py).
+
+Each event is published on progress:<recording id> and also kept under
+progress:last:<recording id> (PROGRESS_TTL_SEC), so a client that connects mid-job
+gets the current state without touching Postgres. Publishing is best-effort: progress
+must never fail a job.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from rq import get_current_job
+
+from worker.queue import redis
+
+CHANNEL_PREFIX = "progress"
+LAST_PREFIX = "progress:last"
+PROGRESS_TTL_SEC = 6 * 3600
+
+# statuses after which no further events come for a run
+TERMINAL_STATUSES = {"ready", "failed"}
+
+
+def channel(recording_id: str) -> str:
+    return f"{CHANNEL_PREFIX}:{recording_id}"
+
+
+def last_key(recording_id: str) -> str:
+    return f"{LAST_PREFIX}:{recording_id}"
+
+
+def event(
+    recording_id: str,
+    stage: str,
+    status: str,
+    percent: Optional[float] = None,
+    **extra,
+) -> Dict:
+    """stage: queued/transcribing/summarizing/done/failed; percent is within the stage."""
+    return {
+        "recordingId": recording_id,
+        "stage": stage,
+        "status": status,
+        "percent": None if percent is None else round(min(max(percent, 0.0), 100.0), 1),
+        "at": datetime.utcnow().isoformat(),
+        **extra,
+    }
+
+
+def publish_many(events: Iterable[Dict]) -> None:
+    """Store + publish events in one Redis round-trip."""
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for e in events:
+            payload = json.dumps(e)
+            pipe.set(last_key(e["recordingId"]), payload, ex=PROGRESS_TTL_SEC)
+            pipe.publish(channel(e["recordingId"]), payload)
+        pipe.execute()
+    except Exception as e:
+        print(f"[progress] ⚠️ could not publish progress: {e}")
+
+
+def publish(recording_id: str, stage: str, status: str, percent: Optional[float] = None, **extra) -> None:
+    publish_many([event(recording_id, stage, status, percent, **extra)])
+
+
+def will_retry() -> bool:
+    """Inside an RQ job: True if this failure isn't final (retries are left)."""
+    job = get_current_job()
+    return bool(job is not None and job.retries_left)
+
+
+def publish_failure(recording_id: str, stage: str, error: Exception) -> None:
+    """Failed attempt: terminal "failed" unless RQ will retry the job ("retrying")."""
+    status = "retrying" if will_retry() else "failed"
+    publish(recording_id, stage, status, error=(str(error) or "")[:500])
@@ -11,8 +11,14 @@ REDIS_URL = os.getenv("UPSTASH_REDIS_URL", "redis://localhost:6379/0")
 # IMPORTANT: don't pass ssl=...; let rediss:// imply TLS
 redis = Redis.from_url(REDIS_URL)
 
-q_long = Queue("long", connection=redis, default_timeout=60 * 20)      # CPU/IO heavy
+q_short = Queue("short", connection=redis, default_timeout=60 * 10)    # short recordings (voice memos)
 q_default = Queue("default", connection=redis, default_timeout=60 * 5) # lighter jobs
+q_long = Queue("long", connection=redis, default_timeout=60 * 20)      # CPU/IO heavy
+q_bulk = Queue("bulk", connection=redis, default_timeout=60 * 20)      # fair-share overflow
+
+# Highest priority first: workers always drain earlier queues before later ones
+QUEUES = {q.name: q for q in (q_short, q_default, q_long, q_bulk)}
+QUEUE_ORDER = list(QUEUES)
 
 def retry_policy() -> Retry:
     return Retry(max=3, interval=[60, 300, 1800])
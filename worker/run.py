@@ -1,8 +1,12 @@
 # backend/worker/run.py
+import os
 from rq import Worker
-from worker.queue import redis
+from worker.queue import redis, QUEUE_ORDER
 
 if __name__ == "__main__":
-    # Listen on both queues using the shared Redis connection
-    worker = Worker(["long", "default"], connection=redis)
-    worker.work(with_scheduler=True, burst=False)
\ No newline at end of file
+    # Listen on all queues in priority order (short > default > long > bulk) using the
+    # shared Redis connection. RQ_QUEUES=long,bulk pins a worker to some classes, e.g.
+    # to keep a dedicated pool for long recordings.
+    names = [q.strip() for q in os.getenv("RQ_QUEUES", "").split(",") if q.strip()]
+    worker = Worker(names or QUEUE_ORDER, connection=redis)
+    worker.work(with_scheduler=True, burst=False)
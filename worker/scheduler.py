@@ -0,0 +1,325 @@
+# backend/worker/scheduler.py
+"""
+Picks the queue and timeout for a transcription job, and keeps per-queue metrics.
+
+Routing (first match wins):
+  bulk     the user already has SCHED_FAIR_SHARE_INFLIGHT transcriptions queued/running,
+           so one user's backfill can't starve everyone else's short memos
+  short    expected audio <= SCHED_SHORT_MAX_SEC (default 10 min)
+  long     everything else
+
+Expected audio is the probed duration_sec, or an estimate from file size when the
+probe hasn't run yet. The job timeout scales with it (SCHED_TIMEOUT_PER_AUDIO_SEC x
+duration + SCHED_TIMEOUT_BASE_SEC), clamped to SCHED_TIMEOUT_MAX_SEC.
+
+Per-user in-flight jobs and per-queue metrics live in Redis and are maintained by RQ
+success/failure callbacks; a failed attempt that RQ will retry stays in flight. In-flight
+jobs are a sorted set per user (job id -> expiry), not a counter: a job whose callback
+never ran (killed worker) drops out on its own after INFLIGHT_TTL_SEC, and can't keep
+the user in `bulk` for longer than that.
+
+Transcription and summarize jobs get deterministic ids (transcribe_job_id,
+summarize_job_id) and go through enqueue_unique(), so repeated requests for the same
+recording fold into one job.
+"""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rq import Callback, Queue
+from rq.job import Job, JobStatus
+
+from worker.queue import QUEUES, QUEUE_ORDER, redis
+
+INFLIGHT_PREFIX = "sched:inflight-jobs"  # sorted sets; "sched:inflight" held the old counters
+METRICS_PREFIX = "sched:metrics"
+INFLIGHT_TTL_SEC = 24 * 3600  # a job not settled by then is presumed lost
+CLAIM_PREFIX = "sched:claim"
+CLAIM_TTL_SEC = 30
+
+ACTIVE_JOB_STATUSES = {JobStatus.QUEUED, JobStatus.STARTED, JobStatus.DEFERRED, JobStatus.SCHEDULED}
+
+# Part of every deterministic job id. Bumping it only keeps new requests from folding
+# into jobs an older deployment left queued; it does not re-run recordings that are
+# already `ready` (the claim and the jobs' checkpoints skip those).
+PIPELINE_VERSION = int(os.getenv("PIPELINE_VERSION", "1"))
+
+# rough bytes per second of media, for estimating duration before the probe lands
+AUDIO_BYTES_PER_SEC = 16_000    # ~128 kbps
+VIDEO_BYTES_PER_SEC = 250_000   # ~2 Mbps
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class Route:
+    queue: str
+    timeout: int
+    expected_sec: int
+    user_id: Optional[int] = None
+
+
+def expected_duration_sec(
+    duration_sec: Optional[int], file_size: Optional[int], mime_type: Optional[str]
+) -> int:
+    if duration_sec:
+        return int(duration_sec)
+    rate = VIDEO_BYTES_PER_SEC if (mime_type or "").startswith("video/") else AUDIO_BYTES_PER_SEC
+    return int((file_size or 0) / rate)
+
+
+def _timeout_for(expected_sec: int) -> int:
+    base = _env_int("SCHED_TIMEOUT_BASE_SEC", 300)
+    per_sec = _env_float("SCHED_TIMEOUT_PER_AUDIO_SEC", 1.5)
+    return min(int(base + expected_sec * per_sec), _env_int("SCHED_TIMEOUT_MAX_SEC", 4 * 3600))
+
+
+def _inflight_key(user_id) -> str:
+    return f"{INFLIGHT_PREFIX}:{user_id}"
+
+
+def _count_inflight(pipe, user_id) -> None:
+    # drop expired members first, then count; queued into `pipe`, read the ZCARD reply
+    key = _inflight_key(user_id)
+    pipe.zremrangebyscore(key, "-inf", time.time())
+    pipe.zcard(key)
+
+
+def inflight(user_id) -> int:
+    try:
+        with redis.pipeline(transaction=False) as pipe:
+            _count_inflight(pipe, user_id)
+            return int(pipe.execute()[-1])
+    except Exception:
+        return 0
+
+
+def _route(rec, user_inflight: int) -> Route:
+    expected = expected_duration_sec(rec.duration_sec, rec.file_size, rec.mime_type)
+    user_id = getattr(rec, "user_id", None)
+    if user_id is not None and user_inflight >= _env_int("SCHED_FAIR_SHARE_INFLIGHT", 4):
+        name = "bulk"
+    elif expected <= _env_int("SCHED_SHORT_MAX_SEC", 600):
+        name = "short"
+    else:
+        name = "long"
+    return Route(queue=name, timeout=_timeout_for(expected), expected_sec=expected, user_id=user_id)
+
+
+def route(rec) -> Route:
+    """Queue + timeout for transcribing `rec` (a Recording or a row with the same attributes)."""
+    user_id = getattr(rec, "user_id", None)
+    return _route(rec, inflight(user_id) if user_id is not None else 0)
+
+
+def route_many(recs) -> List[Route]:
+    """route() for a batch: one pipeline for all users, counting the batch's own jobs as it goes."""
+    users = sorted({r.user_id for r in recs if getattr(r, "user_id", None) is not None})
+    try:
+        with redis.pipeline(transaction=False) as pipe:
+            for u in users:
+                _count_inflight(pipe, u)
+            counts = pipe.execute()[1::2]
+    except Exception:
+        counts = [None] * len(users)
+    current = {u: int(c or 0) for u, c in zip(users, counts)}
+    out = []
+    for rec in recs:
+        user_id = getattr(rec, "user_id", None)
+        out.append(_route(rec, current.get(user_id, 0)))
+        if user_id is not None:
+            current[user_id] += 1
+    return out
+
+
+def transcribe_job_id(recording_id: str) -> str:
+    """Deterministic RQ job id: one live transcription per recording and pipeline version."""
+    return f"transcribe-{recording_id}-v{PIPELINE_VERSION}"
+
+
+def summarize_job_id(recording_id: str) -> str:
+    return f"summarize-{recording_id}-v{PIPELINE_VERSION}"
+
+
+def enqueue_summaries(recording_ids: Sequence[str], func, **kwargs) -> Dict[str, bool]:
+    """enqueue_unique() for summarize jobs: always the default queue, no fair-share."""
+    r = Route(queue="default", timeout=_env_int("SCHED_SUMMARY_TIMEOUT_SEC", 300), expected_sec=0)
+    return enqueue_unique(
+        [(r, (rid,), summarize_job_id(rid)) for rid in recording_ids], func, **kwargs
+    )
+
+
+def enqueue_many_routed(
+    items: Sequence[Tuple[Route, tuple, Optional[str]]], func, **kwargs
+) -> list:
+    """
+    Enqueue func(*args) for every (route, args, job_id) in one Redis round-trip: jobs
+    are grouped per queue with Queue.enqueue_many and everything, counters included,
+    goes through a single pipeline.
+    """
+    with redis.pipeline() as pipe:
+        jobs = _enqueue_on(pipe, items, func, **kwargs)
+        pipe.execute()
+    return jobs
+
+
+def _enqueue_on(pipe, items: Sequence[Tuple[Route, tuple, Optional[str]]], func, **kwargs) -> list:
+    by_queue: Dict[str, list] = {}
+    for r, args, job_id in items:
+        by_queue.setdefault(r.queue, []).append(Queue.prepare_data(
+            func, args=args,
+            timeout=r.timeout,
+            job_id=job_id,
+            meta={"user_id": r.user_id, "queue_class": r.queue},
+            on_success=Callback(on_job_success),
+            on_failure=Callback(on_job_failure),
+            **kwargs,
+        ))
+    jobs = []
+    for name, data in by_queue.items():
+        jobs += QUEUES[name].enqueue_many(data, pipeline=pipe)
+    _count_enqueued(pipe, jobs)
+    return jobs
+
+
+def enqueue_unique(
+    items: Sequence[Tuple[Route, tuple, str]], func, **kwargs
+) -> Dict[str, bool]:
+    """
+    enqueue_many_routed() that folds duplicates into the job already holding the id.
+
+    Each id is first claimed with SET NX (CLAIM_TTL_SEC), so concurrent callers can't
+    both pass the existence check; ids whose job is still queued/scheduled/running are
+    left alone, finished/failed ones are replaced. Returns {job_id: newly_enqueued}.
+
+    Three round-trips per batch: the claims (one pipeline), Job.fetch_many, and one
+    pipeline holding the enqueues, counters and claim release. Replacing a finished or
+    failed job adds Job.delete()'s own few round-trips, once per replaced job.
+    """
+    if not items:
+        return {}
+    ids = [job_id for _, _, job_id in items]
+    claim_keys = [f"{CLAIM_PREFIX}:{job_id}" for job_id in ids]
+    with redis.pipeline(transaction=False) as pipe:
+        for key in claim_keys:
+            pipe.set(key, 1, nx=True, ex=CLAIM_TTL_SEC)
+        claimed = pipe.execute()
+    owned = [key for key, ok in zip(claim_keys, claimed) if ok]
+    released = not owned
+    try:
+        mine = [item for item, ok in zip(items, claimed) if ok]
+        existing = Job.fetch_many([job_id for _, _, job_id in mine], connection=redis)
+        todo = []
+        for item, job in zip(mine, existing):
+            if job is not None and job.get_status(refresh=False) in ACTIVE_JOB_STATUSES:
+                continue
+            if job is not None:
+                job.delete()  # finished/failed/stopped: make room for the new run
+            todo.append(item)
+        if owned:
+            with redis.pipeline() as pipe:
+                _enqueue_on(pipe, todo, func, **kwargs)
+                pipe.delete(*owned)
+                pipe.execute()
+            released = True
+    finally:
+        if not released:
+            redis.delete(*owned)
+    new_ids = {job_id for _, _, job_id in todo}
+    return {job_id: job_id in new_ids for job_id in ids}
+
+
+def _count_enqueued(pipe, jobs) -> None:
+    expires = time.time() + INFLIGHT_TTL_SEC
+    for job in jobs:
+        user_id = job.meta.get("user_id")
+        if user_id is not None:
+            # re-enqueueing an id (enqueue_unique) only moves its expiry, never counts twice
+            pipe.zadd(_inflight_key(user_id), {job.id: expires})
+            pipe.expire(_inflight_key(user_id), INFLIGHT_TTL_SEC)
+        pipe.hincrby(f"{METRICS_PREFIX}:{job.meta['queue_class']}", "enqueued", 1)
+
+
+# ---- RQ callbacks (run inside the worker) ----
+def _secs(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    if (start.tzinfo is None) != (end.tzinfo is None):
+        start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+    return max((end - start).total_seconds(), 0.0)
+
+
+def _record(job, connection, outcome: str) -> None:
+    queue_class = job.meta.get("queue_class") or job.origin
+    now = datetime.now(timezone.utc)
+    wait = _secs(job.enqueued_at, job.started_at)
+    run = _secs(job.started_at, job.ended_at or now)
+    key = f"{METRICS_PREFIX}:{queue_class}"
+    pipe = connection.pipeline(transaction=False)
+    pipe.hincrby(key, outcome, 1)
+    if wait is not None:
+        pipe.hincrbyfloat(key, "wait_sec_total", wait)
+        pipe.hincrby(key, "wait_count", 1)
+    if run is not None:
+        pipe.hincrbyfloat(key, "run_sec_total", run)
+        pipe.hincrby(key, "run_count", 1)
+    user_id = job.meta.get("user_id")
+    if user_id is not None:
+        if outcome == "retried":
+            # still in flight: restart its clock for the next attempt (XX: only if tracked)
+            pipe.zadd(_inflight_key(user_id), {job.id: time.time() + INFLIGHT_TTL_SEC}, xx=True)
+        else:
+            pipe.zrem(_inflight_key(user_id), job.id)
+    pipe.execute()
+
+
+def _safe_record(job, connection, outcome: str) -> None:
+    # a raising success callback would fail the job itself; metrics are best-effort
+    try:
+        _record(job, connection, outcome)
+    except Exception as e:
+        print(f"[scheduler] ⚠️ could not record {outcome} for {job.id}: {e}")
+
+
+def on_job_success(job, connection, result, *args, **kwargs):
+    _safe_record(job, connection, "succeeded")
+
+
+def on_job_failure(job, connection, type, value, traceback):
+    # RQ runs this before deciding on a retry: a pending retry keeps the job in flight
+    _safe_record(job, connection, "retried" if job.retries_left else "failed")
+
+
+# ---- Reporting ----
+def queue_metrics() -> Dict[str, Dict]:
+    """Per queue class: backlog plus counters and mean wait/run seconds since metrics began."""
+    out = {}
+    for name in QUEUE_ORDER:
+        raw = {k.decode(): float(v) for k, v in redis.hgetall(f"{METRICS_PREFIX}:{name}").items()}
+        wait_n, run_n = raw.get("wait_count", 0), raw.get("run_count", 0)
+        out[name] = {
+            "queued": QUEUES[name].count,
+            "enqueued": int(raw.get("enqueued", 0)),
+            "succeeded": int(raw.get("succeeded", 0)),
+            "failed": int(raw.get("failed", 0)),
+            "retried": int(raw.get("retried", 0)),
+            "avgWaitSec": round(raw["wait_sec_total"] / wait_n, 2) if wait_n else None,
+            "avgRunSec": round(raw["run_sec_total"] / run_n, 2) if run_n else None,
+        }
+    return out
@@ -0,0 +1,377 @@
+# backend/worker/summarization.py
+"""
+Pluggable summarization + task extraction for the worker.
+
+Engines take a *batch* of transcripts per call: per-call overhead (model load, HTTP
+round-trip, prompt preamble) dominates for typical meeting lengths, so the summarize
+job packs several ready transcripts into one call (SUMMARY_BATCH_SIZE /
+SUMMARY_BATCH_MAX_CHARS).
+
+Transcripts longer than SUMMARY_MAX_CHARS go through summarize_long() instead: a
+map-reduce over segment-aligned chunks (see the section below).
+
+Engines (SUMMARY_ENGINE):
+  local   deterministic extractive heuristics, no model or network (default; tests/dev)
+  openai  chat-completions model (SUMMARY_MODEL, default "gpt-4o-mini"); needs the
+          optional `openai` package and OPENAI_API_KEY
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from worker.queue import redis
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class SummaryResult:
+    summary: str
+    decisions: List[str] = field(default_factory=list)
+    questions: List[str] = field(default_factory=list)
+    # {"title", "assignee", "due_date" (datetime|None), "priority" (low/med/high|None), "confidence"}
+    tasks: List[Dict] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=lambda v: v.isoformat())
+
+    @classmethod
+    def from_json(cls, raw) -> "SummaryResult":
+        data = json.loads(raw)
+        for t in data["tasks"]:
+            t["due_date"] = datetime.fromisoformat(t["due_date"]) if t.get("due_date") else None
+        return cls(**data)
+
+
+# =========================
+#         Engines
+# =========================
+class SummarizationEngine(ABC):
+    name = "base"
+
+    @abstractmethod
+    def summarize_batch(self, texts: List[str]) -> List[SummaryResult]:
+        """One result per input text, in order."""
+
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z']+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i if in is it its of on or so that "
+    "the their them then there they this to was we were will with you your our us".split()
+)
+_DECISION = re.compile(r"\b(we (decided|agreed)|decision is|let's go with|we'll go with|agreed to)\b", re.I)
+# "<who> will/should/needs to/'ll <what>": who is I/we in any case (the speaker, no
+# assignee) or a capitalized token, accepted as a name only by _assignee()
+_ACTION = re.compile(
+    r"\b(?P<who>(?i:I|we)|[A-Z][a-z]+)(?:\s+(?:will|needs? to|should|is going to)|['’]ll)"
+    r"\s+(?P<what>[^.?!]{3,})",
+)
+_NOT_NAMES = frozenset(
+    "a all also an and another any anybody anyone both but each every everybody everyone "
+    "everything he her here his if it its maybe my nobody nothing now one our perhaps she "
+    "so some somebody someone something that the their then there these they this those "
+    "what when which who you your".split()
+)
+_LOWER_WORD = re.compile(r"\b[a-z][a-z']*\b")
+_TODO = re.compile(r"\b(action item|to-?do|follow up)\b[:\s-]*(?P<what>[^.?!]{3,})", re.I)
+_DUE = re.compile(r"\bby (?P<date>\d{4}-\d{2}-\d{2})\b")
+_DUE_PHRASE = re.compile(r",?\s*\bby \d{4}-\d{2}-\d{2}\b,?")  # _DUE plus its commas, for titles
+_URGENT = re.compile(r"\b(urgent|asap|immediately|blocker)\b", re.I)
+
+
+class LocalEngine(SummarizationEngine):
+    """Frequency-scored extractive summary and pattern-matched decisions/questions/tasks."""
+
+    name = "local"
+
+    def __init__(self):
+        self._max_sentences = _env_int("SUMMARY_SENTENCES", 3)
+
+    def _summary(self, sentences: List[str]) -> str:
+        freq = Counter(w for s in sentences for w in _WORD.findall(s.lower()) if w not in _STOPWORDS)
+        if not freq:
+            return " ".join(sentences[: self._max_sentences])
+
+        def score(i: int) -> float:
+            words = [w for w in _WORD.findall(sentences[i].lower()) if w not in _STOPWORDS]
+            return sum(freq[w] for w in words) / (len(words) or 1)
+
+        best = sorted(range(len(sentences)), key=lambda i: (-score(i), i))[: self._max_sentences]
+        return " ".join(sentences[i] for i in sorted(best))
+
+    @staticmethod
+    def _assignee(m: re.Match, common_words: Set[str]):
+        """
+        (ok, assignee) for an _ACTION match. Pronouns/determiners ("It will rain") are no
+        one; a capitalized first word only counts as a name if the text never uses it
+        as an ordinary lowercase word ("Rain will ..." next to "the rain").
+        """
+        who = m.group("who")
+        if who.lower() in ("i", "we"):
+            return True, None
+        if who.lower() in _NOT_NAMES:
+            return False, None
+        if m.start("who") == 0 and who.lower() in common_words:
+            return False, None
+        return True, who
+
+    @classmethod
+    def _task(cls, sentence: str, common_words: Set[str] = frozenset()) -> Optional[Dict]:
+        pos, title = 0, None
+        while title is None:
+            m = _ACTION.search(sentence, pos)
+            if m is None:
+                break
+            ok, assignee = cls._assignee(m, common_words)
+            if ok:
+                title = m.group("what")
+            pos = m.end("who")  # a rejected "This will mean Dana will ..." may hide a real one
+        if title is None:
+            m = _TODO.search(sentence)
+            if not m:
+                return None
+            assignee, title = None, m.group("what")
+        due = _DUE.search(sentence)
+        # the date lives in due_date; "send the deck by 2026-11-01" -> "send the deck"
+        title = re.sub(r"\s{2,}", " ", _DUE_PHRASE.sub(" ", title)).strip(" ,;:-")
+        return {
+            "title": title[:500],
+            "assignee": assignee,
+            "due_date": datetime.fromisoformat(due.group("date")) if due else None,
+            "priority": "high" if _URGENT.search(sentence) else None,
+            "confidence": 0.5,
+        }
+
+    def summarize_one(self, text: str) -> SummaryResult:
+        sentences = [s.strip() for s in _SENTENCE.split(text or "") if s.strip()]
+        common = set(_LOWER_WORD.findall(text or ""))
+        tasks = [t for t in (self._task(s, common) for s in sentences if not s.endswith("?")) if t]
+        return SummaryResult(
+            summary=self._summary(sentences),
+            decisions=[s for s in sentences if _DECISION.search(s)],
+            questions=[s for s in sentences if s.endswith("?")],
+            tasks=tasks,
+        )
+
+    def summarize_batch(self, texts: List[str]) -> List[SummaryResult]:
+        return [self.summarize_one(t) for t in texts]
+
+
+_OPENAI_PROMPT = """You summarize meeting transcripts. For EACH numbered transcript return an
+object with: "summary" (3-5 sentences), "decisions" (list of strings), "questions" (open
+questions, list of strings) and "tasks" (list of {"title", "assignee" or null,
+"due_date" as YYYY-MM-DD or null, "priority" as low/med/high or null, "confidence" 0-1}).
+Reply with JSON only: {"results": [<one object per transcript, same order>]}."""
+
+
+class OpenAIEngine(SummarizationEngine):
+    def __init__(self):
+        try:
+            from openai import OpenAI
+        except ModuleNotFoundError as e:  # optional dependency
+            raise RuntimeError("openai is not installed (pip install openai)") from e
+
+        self.model = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+        self.name = f"openai:{self.model}"
+        self._client = OpenAI()
+
+    @staticmethod
+    def _parse(raw: Dict) -> SummaryResult:
+        tasks = []
+        for t in raw.get("tasks") or []:
+            if not (t.get("title") or "").strip():
+                continue
+            try:
+                due = datetime.fromisoformat(t["due_date"]) if t.get("due_date") else None
+            except ValueError:
+                due = None
+            tasks.append({
+                "title": t["title"].strip()[:500],
+                "assignee": (t.get("assignee") or None),
+                "due_date": due,
+                "priority": t.get("priority") if t.get("priority") in ("low", "med", "high") else None,
+                "confidence": t.get("confidence"),
+            })
+        return SummaryResult(
+            summary=(raw.get("summary") or "").strip(),
+            decisions=[str(d) for d in raw.get("decisions") or []],
+            questions=[str(q) for q in raw.get("questions") or []],
+            tasks=tasks,
+        )
+
+    def summarize_batch(self, texts: List[str]) -> List[SummaryResult]:
+        body = "\n\n".join(f"### Transcript {i + 1}\n{t}" for i, t in enumerate(texts))
+        resp = self._client.chat.completions.create(
+            model=self.model,
+            response_format={"type": "json_object"},
+            temperature=0,
+            messages=[
+                {"role": "system", "content": _OPENAI_PROMPT},
+                {"role": "user", "content": body},
+            ],
+        )
+        results = json.loads(resp.choices[0].message.content).get("results") or []
+        if len(results) != len(texts):
+            raise ValueError(f"Summarizer returned {len(results)} results for {len(texts)} transcripts")
+        return [self._parse(r) for r in results]
+
+
+ENGINES = {
+    "local": LocalEngine,
+    "openai": OpenAIEngine,
+}
+
+_engines: Dict[str, SummarizationEngine] = {}
+
+
+def get_engine(name: Optional[str] = None) -> SummarizationEngine:
+    """Process-wide engine instance (clients/models are created once per worker)."""
+    name = name or os.getenv("SUMMARY_ENGINE", "local")
+    if name not in _engines:
+        try:
+            _engines[name] = ENGINES[name]()
+        except KeyError:
+            raise ValueError(f"Unknown SUMMARY_ENGINE '{name}' (expected one of {sorted(ENGINES)})")
+    return _engines[name]
+
+
+def batch_limits() -> tuple:
+    """(max transcripts, max total characters) per engine call."""
+    return (
+        max(1, _env_int("SUMMARY_BATCH_SIZE", 8)),
+        max(1, _env_int("SUMMARY_BATCH_MAX_CHARS", 60_000)),
+    )
+
+
+# =========================
+#   Map-reduce (long input)
+# =========================
+# Chunk summaries are cached in Redis by engine + content hash, so re-summarizing
+# (retry, prompt tweak in the reduce step, re-run after a partial failure) only pays
+# for chunks whose text actually changed.
+CACHE_PREFIX = "summary:chunk:v1"
+
+
+def is_long(text: str) -> bool:
+    return len(text or "") > _env_int("SUMMARY_MAX_CHARS", 24_000)
+
+
+def chunk_segments(segment_texts: Iterable[str], max_chars: int) -> List[str]:
+    """Greedy packing of whole segments into chunks of at most ~max_chars."""
+    chunks, cur, size = [], [], 0
+    for t in segment_texts:
+        t = t.strip()
+        if not t:
+            continue
+        if cur and size + len(t) + 1 > max_chars:
+            chunks.append(" ".join(cur))
+            cur, size = [], 0
+        cur.append(t)
+        size += len(t) + 1
+    if cur:
+        chunks.append(" ".join(cur))
+    return chunks
+
+
+def _cache_key(engine: SummarizationEngine, text: str) -> str:
+    return f"{CACHE_PREFIX}:{engine.name}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+
+def _map(engine: SummarizationEngine, chunks: List[str]) -> List[SummaryResult]:
+    """Summarize chunks: cache hits first, misses in engine batches across a thread pool."""
+    keys = [_cache_key(engine, c) for c in chunks]
+    try:
+        cached = redis.mget(keys)
+    except Exception:
+        cached = [None] * len(keys)
+    out: List[Optional[SummaryResult]] = [
+        SummaryResult.from_json(c) if c else None for c in cached
+    ]
+    missing = [i for i, r in enumerate(out) if r is None]
+
+    max_items, max_chars = batch_limits()
+    batches, cur, size = [], [], 0
+    for i in missing:
+        if cur and (len(cur) >= max_items or size + len(chunks[i]) > max_chars):
+            batches.append(cur)
+            cur, size = [], 0
+        cur.append(i)
+        size += len(chunks[i])
+    if cur:
+        batches.append(cur)
+
+    workers = max(1, _env_int("SUMMARY_MAP_WORKERS", 4))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        done = pool.map(lambda b: (b, engine.summarize_batch([chunks[i] for i in b])), batches)
+        for b, results in done:
+            for i, res in zip(b, results):
+                out[i] = res
+
+    if missing:
+        ttl = _env_int("SUMMARY_CACHE_TTL_SEC", 30 * 24 * 3600)
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for i in missing:
+                pipe.set(keys[i], out[i].to_json(), ex=ttl)
+            pipe.execute()
+        except Exception:
+            pass
+    return out
+
+
+def _unique(items: Iterable[str]) -> List[str]:
+    seen, out = set(), []
+    for s in items:
+        key = " ".join(s.lower().split())
+        if key and key not in seen:
+            seen.add(key)
+            out.append(s)
+    return out
+
+
+def summarize_long(segment_texts: List[str], engine: Optional[SummarizationEngine] = None) -> SummaryResult:
+    """
+    Hierarchical summary of a transcript too long for one call: segment-aligned chunks
+    (SUMMARY_CHUNK_CHARS) are summarized in parallel (map), then the chunk summaries
+    are summarized again, level by level, until they fit one call (reduce). Decisions,
+    questions and tasks are collected from the chunks and de-duplicated.
+    """
+    engine = engine or get_engine()
+    chunk_chars = max(1_000, _env_int("SUMMARY_CHUNK_CHARS", 12_000))
+    mapped = _map(engine, chunk_segments(segment_texts, chunk_chars))
+
+    summaries = [m.summary for m in mapped]
+    while len(summaries) > 1 and is_long(" ".join(summaries)):
+        level = [m.summary for m in _map(engine, chunk_segments(summaries, chunk_chars))]
+        if len(level) >= len(summaries):  # not converging; reduce what we have in one call
+            break
+        summaries = level
+    final = engine.summarize_batch([" ".join(summaries)])[0] if len(summaries) > 1 else None
+
+    seen_tasks, tasks = set(), []
+    for t in (t for m in mapped for t in m.tasks):
+        key = (" ".join(t["title"].lower().split()), t.get("assignee"))
+        if key not in seen_tasks:
+            seen_tasks.add(key)
+            tasks.append(t)
+    return SummaryResult(
+        summary=final.summary if final else (summaries[0] if summaries else ""),
+        decisions=_unique(d for m in mapped for d in m.decisions),
+        questions=_unique(q for m in mapped for q in m.questions),
+        tasks=tasks,
+    )
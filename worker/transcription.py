@@ -0,0 +1,359 @@
+# backend/worker/transcription.py
+"""
+Pluggable speech-to-text for the worker.
+
+Mono 16 kHz PCM (streamed from ffmpeg, or read from a WAV) is split on silence into
+~TRANSCRIBE_CHUNK_SEC chunks as it arrives, the chunks are decoded in parallel across
+a process pool (one engine instance per process), and the per-chunk segments are
+shifted back onto the recording timeline.
+
+Engines (TRANSCRIBE_ENGINE):
+  faster-whisper  local CPU Whisper via CTranslate2 (WHISPER_MODEL, default "small";
+                  use "tiny" for tests/dev)
+  stub            no model and no text: runs the pipeline (chunking, checkpoints,
+                  progress) without producing a transcript
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+import wave
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16_000
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# =========================
+#         Engines
+# =========================
+class TranscriptionEngine(ABC):
+    """Decode one chunk of mono 16 kHz float32 audio (values in [-1, 1])."""
+
+    name = "base"
+    language: Optional[str] = None
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray) -> List[Dict]:
+        """Return [{"start": sec, "end": sec, "text": str}, ...], times relative to the chunk."""
+
+
+class StubEngine(TranscriptionEngine):
+    """
+    Decodes nothing. Placeholder text would be stored as segments and indexed for search
+    and embeddings like real speech, so a stub run leaves an empty transcript labelled
+    "stub", which app.main does not count as a real one.
+    """
+
+    name = "stub"
+
+    def transcribe(self, audio: np.ndarray) -> List[Dict]:
+        return []
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    def __init__(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ModuleNotFoundError as e:  # optional heavy dependency
+            raise RuntimeError("faster-whisper is not installed (pip install faster-whisper)") from e
+
+        size = os.getenv("WHISPER_MODEL", "small")
+        self.name = f"faster-whisper:{size}"
+        self._language = os.getenv("WHISPER_LANGUAGE") or None
+        self._beam_size = _env_int("WHISPER_BEAM_SIZE", 1)
+        self._model = WhisperModel(
+            size,
+            device="cpu",
+            compute_type=os.getenv("WHISPER_COMPUTE_TYPE", "int8"),
+            # parallelism comes from the process pool; keep each process narrow
+            cpu_threads=_env_int("WHISPER_CPU_THREADS", 1),
+        )
+
+    def transcribe(self, audio: np.ndarray) -> List[Dict]:
+        segments, info = self._model.transcribe(
+            audio, language=self._language, beam_size=self._beam_size
+        )
+        self.language = info.language
+        return [
+            {"start": round(s.start, 2), "end": round(s.end, 2), "text": s.text.strip()}
+            for s in segments
+        ]
+
+
+ENGINES = {
+    "faster-whisper": FasterWhisperEngine,
+    "stub": StubEngine,
+}
+
+
+def get_engine(name: Optional[str] = None) -> TranscriptionEngine:
+    name = name or os.getenv("TRANSCRIBE_ENGINE", "faster-whisper")
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown TRANSCRIBE_ENGINE '{name}' (expected one of {sorted(ENGINES)})")
+
+
+def get_engine_name(name: Optional[str] = None) -> str:
+    """Engine label stored on Transcript.model, without loading a model in this process."""
+    name = name or os.getenv("TRANSCRIBE_ENGINE", "faster-whisper")
+    if name == "faster-whisper":
+        return f"faster-whisper:{os.getenv('WHISPER_MODEL', 'small')}"
+    return name
+
+
+# =========================
+#   Silence-based chunking
+# =========================
+FRAME_LEN = SAMPLE_RATE * 30 // 1000  # 30 ms energy frames
+SMOOTH_FRAMES = 500 // 30             # ~0.5 s of silence wins over a short gap
+
+
+class StreamChunker:
+    """
+    Cut a PCM stream (s16le mono 16 kHz) into ~target_sec chunks, each ending at the
+    quietest ~0.5 s stretch within +/- search_sec of the boundary so cuts rarely land
+    mid-word. Cuts depend only on the samples, never on how the stream was sliced into
+    blocks, so the same audio always splits the same way (file or stream, first run
+    or retry).
+    """
+
+    def __init__(self, target_sec: float, search_sec: float):
+        self._target = max(int(target_sec * SAMPLE_RATE), 2 * FRAME_LEN * SMOOTH_FRAMES)
+        self._search = min(int(search_sec * SAMPLE_RATE), self._target // 2)
+        self._buf = np.empty(0, dtype=np.int16)
+        self._odd = b""
+        self.offset = 0  # samples already emitted
+
+    @staticmethod
+    def _quietest(window: np.ndarray) -> int:
+        frames = len(window) // FRAME_LEN
+        x = window[:frames * FRAME_LEN].reshape(frames, FRAME_LEN).astype(np.float32)
+        energy = np.sqrt(np.mean(x * x, axis=1))
+        energy = np.convolve(energy, np.ones(SMOOTH_FRAMES, dtype=np.float32), mode="same")
+        return int(np.argmin(energy)) * FRAME_LEN + FRAME_LEN // 2
+
+    def feed(self, pcm: bytes) -> List[Tuple[int, np.ndarray]]:
+        """Add PCM bytes; return [(start_sample, samples), ...] for every chunk now complete."""
+        data = self._odd + pcm
+        cut_at = len(data) - len(data) % 2  # keep a dangling half-sample for next time
+        self._odd = data[cut_at:]
+        self._buf = np.concatenate([self._buf, np.frombuffer(data[:cut_at], dtype=np.int16)])
+
+        out = []
+        lo, hi = self._target - self._search, self._target + self._search
+        while len(self._buf) >= hi:
+            cut = lo + self._quietest(self._buf[lo:hi])
+            out.append((self.offset, self._buf[:cut]))
+            self._buf = self._buf[cut:]
+            self.offset += cut
+        return out
+
+    def flush(self) -> List[Tuple[int, np.ndarray]]:
+        if not len(self._buf):
+            return []
+        out = [(self.offset, self._buf)]
+        self.offset += len(self._buf)
+        self._buf = np.empty(0, dtype=np.int16)
+        return out
+
+
+def iter_wav_pcm(path: str, block_sec: int = 1) -> Iterator[bytes]:
+    """Yield the PCM frames of a mono 16 kHz 16-bit WAV in ~block_sec pieces."""
+    with wave.open(path, "rb") as w:
+        if w.getnchannels() != 1 or w.getframerate() != SAMPLE_RATE or w.getsampwidth() != 2:
+            raise ValueError(f"Expected mono {SAMPLE_RATE} Hz 16-bit WAV: {path}")
+        while True:
+            frames = w.readframes(SAMPLE_RATE * block_sec)
+            if not frames:
+                return
+            yield frames
+
+
+# =========================
+#    Parallel decoding
+# =========================
+_engine: Optional[TranscriptionEngine] = None
+
+
+def _init_process(engine_name: Optional[str]) -> None:
+    # runs once per pool process: load the model a single time, not per chunk
+    global _engine
+    _engine = get_engine(engine_name)
+
+
+def _decode_chunk(job: Tuple[int, float, bytes]) -> Tuple[int, List[Dict], Optional[str]]:
+    index, offset_sec, pcm = job
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    segments = _engine.transcribe(audio)
+    for s in segments:
+        s["start"] = round(s["start"] + offset_sec, 2)
+        s["end"] = round(s["end"] + offset_sec, 2)
+    return index, segments, _engine.language
+
+
+@dataclass
+class TranscriptResult:
+    text: str
+    segments: List[Dict] = field(default_factory=list)
+    language: Optional[str] = None
+    model: Optional[str] = None
+    duration_sec: float = 0.0
+    first_segment_sec: Optional[float] = None  # wall-clock until the first segment was ready
+
+
+def _workers() -> int:
+    return max(1, _env_int("TRANSCRIBE_WORKERS", os.cpu_count() or 1))
+
+
+def chunk_sec_for(duration_sec: Optional[float], workers: Optional[int] = None) -> int:
+    """
+    Chunk length for a recording of known duration: TRANSCRIBE_CHUNK_SEC normally, but
+    short recordings are cut finer (down to TRANSCRIBE_MIN_CHUNK_SEC) so every pool
+    process gets a chunk. Only depends on the duration, so retries cut identically.
+    """
+    target = _env_int("TRANSCRIBE_CHUNK_SEC", 60)
+    if not duration_sec:
+        return target
+    floor = min(_env_int("TRANSCRIBE_MIN_CHUNK_SEC", 20), target)
+    per_worker = int(duration_sec // (workers or _workers()))
+    return max(floor, min(target, per_worker))
+
+
+def _chunk_plan(duration_sec: Optional[float], workers: int) -> Tuple[int, int]:
+    target_sec = chunk_sec_for(duration_sec, workers)
+    return target_sec, min(_env_int("TRANSCRIBE_SEARCH_SEC", 10), target_sec // 4)
+
+
+def chunking_key(duration_sec: Optional[float], engine_name: Optional[str] = None) -> str:
+    """
+    Identifies how transcribe_stream() will cut and decode this audio. Per-chunk results
+    saved under one key are only valid for a resume with the same key.
+    """
+    target_sec, search_sec = _chunk_plan(duration_sec, _workers())
+    return f"{get_engine_name(engine_name)}|chunk={target_sec}|search={search_sec}"
+
+
+def transcribe_stream(
+    pcm_blocks: Iterable[bytes],
+    engine_name: Optional[str] = None,
+    on_segments: Optional[Callable[[int, List[Dict], Optional[str]], None]] = None,
+    duration_sec: Optional[float] = None,
+    done: Optional[Dict[int, Tuple[List[Dict], Optional[str]]]] = None,
+) -> TranscriptResult:
+    """
+    Transcribe PCM while it is still arriving (e.g. from worker.audio.r2_pcm).
+
+    Chunks are cut on silence (StreamChunker) and submitted to a pool of
+    TRANSCRIBE_WORKERS processes as soon as they're complete; at most 2x workers are
+    outstanding, which back-pressures ffmpeg instead of buffering the whole recording.
+    on_segments(chunk_index, segments, language) fires in chunk order as soon as each
+    contiguous prefix of chunks is decoded. A known (probed) duration_sec sizes the
+    chunks, see chunk_sec_for().
+
+    `done` maps chunk index -> (segments, language) from an earlier, interrupted run
+    with the same chunking_key(): those chunks are still cut (cuts are deterministic)
+    but not decoded again, and on_segments isn't called for them.
+    """
+    started = time.monotonic()
+    workers = _workers()
+    target_sec, search_sec = _chunk_plan(duration_sec, workers)
+    chunker = StreamChunker(target_sec=target_sec, search_sec=search_sec)
+    done = done or {}
+
+    segments: List[Dict] = []
+    done_chunks: Dict[int, Tuple[List[Dict], Optional[str]]] = {}
+    state = {"next": 0, "submitted": 0, "language": None, "first": None, "engine": False}
+
+    def _emit_ready() -> None:
+        while state["next"] in done_chunks:
+            segs, lang = done_chunks.pop(state["next"])
+            segments.extend(segs)
+            state["language"] = state["language"] or lang
+            if segs and state["first"] is None:
+                state["first"] = round(time.monotonic() - started, 2)
+            if on_segments is not None and state["next"] not in done:
+                on_segments(state["next"], segs, lang)
+            state["next"] += 1
+
+    def _collect(futures) -> None:
+        for f in futures:
+            pending.discard(f)
+            index, segs, lang = f.result()
+            done_chunks[index] = (segs, lang)
+        _emit_ready()
+
+    pending: set = set()
+    if workers == 1:
+        # not worth spawning processes on a 1-core box (model loads on first chunk)
+        pool = None
+    else:
+        # spawn, not fork: RQ's work-horse may already hold threads/sockets
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process,
+            initargs=(engine_name,),
+        )
+
+    def _submit(offset: int, samples: np.ndarray) -> None:
+        index = state["submitted"]
+        state["submitted"] += 1
+        if index in done:  # checkpointed by an earlier run
+            done_chunks[index] = done[index]
+            _emit_ready()
+            return
+        job = (index, offset / SAMPLE_RATE, samples.tobytes())
+        if pool is None:
+            if not state["engine"]:
+                _init_process(engine_name)
+                state["engine"] = True
+            index, segs, lang = _decode_chunk(job)
+            done_chunks[index] = (segs, lang)
+            _emit_ready()
+            return
+        while len(pending) >= 2 * workers:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            _collect(finished)
+        pending.add(pool.submit(_decode_chunk, job))
+
+    try:
+        for block in pcm_blocks:
+            for offset, samples in chunker.feed(block):
+                _submit(offset, samples)
+            _collect([f for f in pending if f.done()])
+        for offset, samples in chunker.flush():
+            _submit(offset, samples)
+        if pending:
+            finished, _ = wait(pending)
+            _collect(finished)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return TranscriptResult(
+        text=" ".join(s["text"] for s in segments if s["text"]),
+        segments=segments,
+        language=state["language"],
+        model=get_engine_name(engine_name),
+        duration_sec=round(chunker.offset / SAMPLE_RATE, 2),
+        first_segment_sec=state["first"],
+    )
+
+
+def transcribe_wav(wav_path: str, engine_name: Optional[str] = None) -> TranscriptResult:
+    """Transcribe a local mono 16 kHz WAV (same chunking/decoding as the streaming path)."""
+    return transcribe_stream(iter_wav_pcm(wav_path), engine_name=engine_name)